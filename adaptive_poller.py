@@ -0,0 +1,148 @@
+"""
+Adaptive Poller - Per-endpoint polling intervals driven by how often content actually changes
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Keep estimates away from 0 and 1, where the Poisson conversion breaks down
+MIN_CHANGE_PROBABILITY = 0.02
+MAX_CHANGE_PROBABILITY = 0.95
+
+
+def content_fingerprint(keys: Iterable[str]) -> bytes:
+    """Order-independent digest of the items a response contained"""
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(keys):
+        digest.update(key.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.digest()
+
+
+class EndpointSchedule:
+    """Polling state for one endpoint"""
+
+    __slots__ = ('interval', 'next_due', 'change_probability', 'fingerprint', 'polls', 'changes')
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_due = 0.0
+        self.change_probability = 0.5
+        self.fingerprint: Optional[bytes] = None
+        self.polls = 0
+        self.changes = 0
+
+    def change_rate(self) -> float:
+        """Estimated content changes per second, treating changes as a Poisson process"""
+        p = min(max(self.change_probability, MIN_CHANGE_PROBABILITY), MAX_CHANGE_PROBABILITY)
+        return -math.log(1 - p) / self.interval
+
+
+class AdaptivePoller:
+    """Decides which endpoints are due, and retunes each one's interval from what it saw.
+
+    Every poll records whether the endpoint's content changed. An EWMA of that gives
+    the chance of a change per poll at the current interval, which converts to a change
+    rate; the new interval is the one at which about target_change_probability of polls
+    would see something new. Intervals are clamped to [min_interval, max_interval] and
+    then stretched together if the sum of all endpoints' poll rates would exceed the
+    request budget.
+    """
+
+    def __init__(self, min_interval: float = None, max_interval: float = None,
+                 budget_per_minute: float = None, initial_interval: float = None):
+        self.min_interval = min_interval or CONFIG["poll_min_interval_seconds"]
+        self.max_interval = max_interval or CONFIG["poll_max_interval_seconds"]
+        self.initial_interval = initial_interval or CONFIG["scan_interval_seconds"]
+        self.budget_per_minute = budget_per_minute or CONFIG["poll_budget_per_minute"]
+        self.alpha = CONFIG["poll_change_alpha"]
+        self.target_change_probability = CONFIG["poll_target_change_probability"]
+        self._schedules: Dict[str, EndpointSchedule] = {}
+        self._lock = threading.Lock()
+
+    def _schedule(self, endpoint: str) -> EndpointSchedule:
+        schedule = self._schedules.get(endpoint)
+        if schedule is None:
+            interval = min(max(self.initial_interval, self.min_interval), self.max_interval)
+            schedule = EndpointSchedule(interval)
+            self._schedules[endpoint] = schedule
+        return schedule
+
+    def take_due(self, endpoints: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Endpoints due for a poll, in the order given; each one's next poll is scheduled now"""
+        now = time.monotonic() if now is None else now
+        due = []
+        with self._lock:
+            for endpoint in endpoints:
+                schedule = self._schedule(endpoint)
+                if schedule.next_due <= now:
+                    schedule.next_due = now + schedule.interval
+                    due.append(endpoint)
+        return due
+
+    def record_fingerprint(self, endpoint: str, fingerprint: bytes):
+        """Record a successful poll by content fingerprint; the first one only sets a baseline"""
+        with self._lock:
+            schedule = self._schedule(endpoint)
+            previous, schedule.fingerprint = schedule.fingerprint, fingerprint
+        if previous is not None:
+            self.record_change(endpoint, fingerprint != previous)
+
+    def record_change(self, endpoint: str, changed: bool):
+        """Record whether a successful poll saw new content, and retune every interval"""
+        with self._lock:
+            schedule = self._schedule(endpoint)
+            schedule.polls += 1
+            schedule.changes += changed
+            schedule.change_probability += self.alpha * (float(changed) - schedule.change_probability)
+            self._rebalance()
+
+    def _rebalance(self):
+        """Set each interval from its change rate, then fit the total into the budget"""
+        target_rate = -math.log(1 - self.target_change_probability)
+        desired = {}
+        for endpoint, schedule in self._schedules.items():
+            rate = schedule.change_rate()
+            desired[endpoint] = min(max(target_rate / rate, self.min_interval), self.max_interval)
+
+        # Stretch intervals by a common factor until the total fits the budget; endpoints
+        # that hit max_interval stop stretching and leave the rest of the budget to others
+        stretch = 1.0
+        for _ in range(len(desired)):
+            capped = sum(60.0 / self.max_interval for interval in desired.values()
+                         if interval * stretch >= self.max_interval)
+            free = sum(60.0 / interval for interval in desired.values()
+                       if interval * stretch < self.max_interval)
+            if not free or capped + free / stretch <= self.budget_per_minute:
+                break
+            stretch = max(stretch, free / max(self.budget_per_minute - capped, 1e-9))
+
+        for endpoint, schedule in self._schedules.items():
+            interval = min(desired[endpoint] * stretch, self.max_interval)
+            # Bring a pending poll forward when the endpoint just sped up
+            schedule.next_due = min(schedule.next_due, schedule.next_due - schedule.interval + interval)
+            schedule.interval = interval
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                endpoint: {
+                    'interval': round(schedule.interval, 1),
+                    'change_probability': round(schedule.change_probability, 3),
+                    'polls': schedule.polls,
+                    'changes': schedule.changes,
+                }
+                for endpoint, schedule in self._schedules.items()
+            }
+
+    def polls_per_minute(self) -> float:
+        with self._lock:
+            return sum(60.0 / schedule.interval for schedule in self._schedules.values())
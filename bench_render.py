@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for alert rendering: cold renders, cached renders and digest packing
+"""
+
+import random
+import time
+import timeit
+
+from config import CHAIN_CONFIGS
+from models import Token
+from message_renderer import MessageRenderer
+from digest import pack_digests
+
+TOKEN_COUNT = 1000
+REPEAT = 5
+
+
+def make_tokens(count: int):
+    """Tokens with realistic field sizes spread across the configured chains"""
+    random.seed(42)
+    chains = list(CHAIN_CONFIGS) + ['unknownchain']
+    now = time.time()
+    return [
+        Token.create(
+            address=f"{random.getrandbits(160):040x}",
+            name=f"Token {i}",
+            symbol=f"TK{i}",
+            chain=random.choice(chains),
+            market_cap=random.uniform(1e3, 5e6),
+            price_usd=random.uniform(1e-8, 1),
+            liquidity_usd=random.uniform(1e3, 1e6),
+            volume_24h=random.uniform(0, 1e7),
+            price_change_24h=random.uniform(-50, 50),
+            created_timestamp=now - random.uniform(0, 86400 * 3),
+            website="https://example.com",
+            telegram=f"https://t.me/token{i}",
+            twitter=f"https://x.com/token{i}",
+            source="dexscreener",
+        )
+        for i in range(count)
+    ]
+
+
+def bench(label: str, fn, per_call: int):
+    best = min(timeit.repeat(fn, number=1, repeat=REPEAT))
+    print(f"{label:<28} {best * 1e3:8.2f} ms total  {best / per_call * 1e6:8.2f} µs/token")
+
+
+def main():
+    tokens = make_tokens(TOKEN_COUNT)
+    print(f"Rendering {TOKEN_COUNT} tokens, best of {REPEAT}\n")
+
+    def cold_alerts():
+        renderer = MessageRenderer(cache_size=TOKEN_COUNT * 2)
+        for token in tokens:
+            renderer.render_alert(token)
+
+    warm = MessageRenderer(cache_size=TOKEN_COUNT * 2)
+    for token in tokens:
+        warm.render_alert(token)
+        warm.render_compact(token)
+
+    def warm_alerts():
+        for token in tokens:
+            warm.render_alert(token)
+
+    def warm_compact():
+        for token in tokens:
+            warm.render_compact(token)
+
+    bench("alert, cold cache", cold_alerts, TOKEN_COUNT)
+    bench("alert, warm cache", warm_alerts, TOKEN_COUNT)
+    bench("digest entry, warm cache", warm_compact, TOKEN_COUNT)
+    bench("pack_digests by chain", lambda: pack_digests(tokens, 'chain'), TOKEN_COUNT)
+    bench("pack_digests by risk", lambda: pack_digests(tokens, 'risk'), TOKEN_COUNT)
+    print(f"\nRender cache: {warm.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Bloom Filter - Compact probabilistic membership for large dedup windows
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque
+
+
+def token_key(token_id: str) -> bytes:
+    """Fixed-size 16-byte binary key for a "chain:address" string"""
+    return hashlib.blake2b(token_id.encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Bit-array Bloom filter sized for a capacity and target false-positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.bits_set = 0
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        """Kirsch-Mitzenmacher double hashing over the two halves of the digest"""
+        h1 = int.from_bytes(key[:8], 'little')
+        h2 = int.from_bytes(key[8:16], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes):
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                self.bits_set += 1
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def estimated_false_positive_rate(self) -> float:
+        """Current false-positive probability from the fraction of bits set"""
+        return (self.bits_set / self.num_bits) ** self.num_hashes
+
+
+class RotatingBloomFilter:
+    """Bloom filters in time-sliced generations, so old keys age out without deletes.
+
+    Keys are added to the newest generation and looked up in all of them. A new
+    generation starts every window / (generations - 1) seconds and the oldest is
+    dropped, so every key stays visible for at least window_seconds. A zero window
+    remembers nothing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, window_seconds: float, generations: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.generations = max(2, generations)
+        self.rotation_seconds = window_seconds / (self.generations - 1)
+        self.enabled = self.rotation_seconds > 0
+        self._filters: Deque[BloomFilter] = deque([self._new_filter()] if self.enabled else [])
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _new_filter(self) -> BloomFilter:
+        # Each generation only holds the keys added during one rotation period
+        return BloomFilter(max(1, math.ceil(self.capacity / (self.generations - 1))), self.error_rate)
+
+    def _rotate(self):
+        rotations = int((time.monotonic() - self._rotated_at) // self.rotation_seconds)
+        if not rotations:
+            return
+        self._rotated_at += rotations * self.rotation_seconds
+        if rotations >= self.generations:
+            # Idle for a whole window: every generation has aged out, start over with one
+            self._filters.clear()
+            rotations = 1
+        for _ in range(rotations):
+            self._filters.append(self._new_filter())
+            if len(self._filters) > self.generations:
+                self._filters.popleft()
+
+    def add(self, key: bytes):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._rotate()
+            self._filters[-1].add(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._rotate()
+            return any(key in bloom for bloom in self._filters)
+
+    def estimated_false_positive_rate(self) -> float:
+        """Chance that a lookup falsely hits in any live generation"""
+        with self._lock:
+            miss_all = 1.0
+            for bloom in self._filters:
+                miss_all *= 1.0 - bloom.estimated_false_positive_rate()
+            return 1.0 - miss_all
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(len(bloom.bits) for bloom in self._filters)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self._filters)
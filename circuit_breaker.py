@@ -0,0 +1,153 @@
+"""
+Circuit Breaker - Per-endpoint failure tracking so dead upstreams are skipped
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, List
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with jittered exponential backoff and a health score"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0            # Consecutive trips, drives the backoff exponent
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.health = 1.0              # EWMA of success (1.0) / failure (0.0)
+        self.latency = 0.0             # EWMA of successful request latency in seconds
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Decide whether a request may go out now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() < self.open_until:
+                    return False
+                # Backoff elapsed, let a single probe through
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                logger.info(f"Circuit half-open for {self.name}, sending probe")
+
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float = 0.0):
+        """Close the circuit and improve the health score"""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit closed for {self.name}")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.probe_in_flight = False
+            self._update_health(1.0)
+            alpha = CONFIG["circuit_health_alpha"]
+            self.latency = latency if not self.latency else (1 - alpha) * self.latency + alpha * latency
+
+    def record_failure(self):
+        """Count a failure and open the circuit once the threshold is hit"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._update_health(0.0)
+
+            if self.state == HALF_OPEN or self.consecutive_failures >= CONFIG["circuit_failure_threshold"]:
+                self._trip()
+
+    def release_probe(self):
+        """Hand back a half-open probe that never got an answer, so the next request may probe"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+
+    def _update_health(self, outcome: float):
+        alpha = CONFIG["circuit_health_alpha"]
+        self.health = (1 - alpha) * self.health + alpha * outcome
+
+    def _trip(self):
+        """Open the circuit for an exponentially growing, jittered period"""
+        self.open_count += 1
+        backoff = min(
+            CONFIG["circuit_max_backoff_seconds"],
+            CONFIG["circuit_base_backoff_seconds"] * 2 ** (self.open_count - 1)
+        )
+        jitter = CONFIG["circuit_backoff_jitter"]
+        backoff *= random.uniform(1 - jitter, 1 + jitter)
+
+        self.state = OPEN
+        self.probe_in_flight = False
+        self.open_until = time.monotonic() + backoff
+        logger.warning(f"Circuit open for {self.name} after {self.consecutive_failures} failures, retrying in {backoff:.0f}s")
+
+    def score(self) -> float:
+        """Health score used for ordering: success rate, lightly penalised by latency"""
+        return self.health / (1.0 + self.latency / CONFIG["request_timeout"])
+
+
+class EndpointHealth:
+    """Registry of circuit breakers keyed by endpoint URL"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get or create the breaker for an endpoint"""
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def allow(self, endpoint: str) -> bool:
+        return self.breaker(endpoint).allow_request()
+
+    def record_success(self, endpoint: str, latency: float = 0.0):
+        self.breaker(endpoint).record_success(latency)
+
+    def record_failure(self, endpoint: str):
+        self.breaker(endpoint).record_failure()
+
+    def release_probe(self, endpoint: str):
+        self.breaker(endpoint).release_probe()
+
+    def prioritize(self, endpoints: List[str]) -> List[str]:
+        """Return the endpoints whose circuits allow a request, healthiest first"""
+        allowed = [endpoint for endpoint in endpoints if self.allow(endpoint)]
+        skipped = len(endpoints) - len(allowed)
+        if skipped:
+            logger.info(f"Skipping {skipped} endpoints with open circuits")
+        return sorted(allowed, key=lambda endpoint: self.breaker(endpoint).score(), reverse=True)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-endpoint state for logging"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {
+            breaker.name: {
+                'state': breaker.state,
+                'health': round(breaker.health, 3),
+                'latency': round(breaker.latency, 3),
+                'failures': breaker.consecutive_failures,
+            }
+            for breaker in breakers
+        }
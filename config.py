@@ -20,13 +20,89 @@ CONFIG: Dict[str, Any] = {
     
     # Bot behavior
     "scan_interval_minutes": int(os.getenv("SCAN_INTERVAL_MINUTES", "2")),   # Scan every 2 minutes
+    "scan_interval_seconds": float(os.getenv("SCAN_INTERVAL_SECONDS", "0")),  # Sub-minute interval; 0 = use minutes
+    "adaptive_polling": os.getenv("ADAPTIVE_POLLING", "false").lower() == "true",  # Per-endpoint intervals
+    "poll_min_interval_seconds": float(os.getenv("POLL_MIN_INTERVAL_SECONDS", "10")),   # Fastest any endpoint is polled
+    "poll_max_interval_seconds": float(os.getenv("POLL_MAX_INTERVAL_SECONDS", "600")),  # Slowest any endpoint is polled
+    "poll_budget_per_minute": float(os.getenv("POLL_BUDGET_PER_MINUTE", "0")),  # Total polls/min; 0 = what fixed-interval scans use
+    "poll_change_alpha": float(os.getenv("POLL_CHANGE_ALPHA", "0.3")),      # EWMA weight of the latest change observation
+    "poll_target_change_probability": float(os.getenv("POLL_TARGET_CHANGE_PROBABILITY", "0.5")),  # Aim for new content on half the polls
+    "scan_deadline_seconds": float(os.getenv("SCAN_DEADLINE_SECONDS", "0")),  # Hard cap per scan; 0 = 90% of the interval
     "max_tokens_per_scan": int(os.getenv("MAX_TOKENS_PER_SCAN", "50")),     # Post max 50 tokens per scan
+    "edit_in_place": os.getenv("EDIT_IN_PLACE", "true").lower() == "true",   # Edit earlier alerts on big changes
+    "edit_min_change_pct": float(os.getenv("EDIT_MIN_CHANGE_PCT", "25")),    # Change in cap/liquidity/volume that triggers an edit
+    "edit_min_interval_seconds": int(os.getenv("EDIT_MIN_INTERVAL_SECONDS", "300")),  # Per-alert edit spacing
+    "alert_edit_window_hours": int(os.getenv("ALERT_EDIT_WINDOW_HOURS", "24")),        # How long alerts stay editable
+    "alert_tracking_size": int(os.getenv("ALERT_TRACKING_SIZE", "10000")),   # Alerts kept in memory for edits
+    "render_cache_size": int(os.getenv("RENDER_CACHE_SIZE", "5000")),       # Rendered alerts kept for reuse
+    "subscriptions_path": os.getenv("SUBSCRIPTIONS_PATH", ""),             # JSON list of per-chat filter profiles; empty = CHAT_ID only
+    "digest_mode": os.getenv("DIGEST_MODE", "false").lower() == "true",      # Pack alerts into digest messages
+    "digest_group_by": os.getenv("DIGEST_GROUP_BY", "chain"),               # chain, risk or none
+    "digest_flush_size": int(os.getenv("DIGEST_FLUSH_SIZE", "25")),         # Tokens buffered before a digest goes out
     "duplicate_check_hours": int(os.getenv("DUPLICATE_CHECK_HOURS", "6")),   # Don't repost within 6 hours
+    "seen_tokens_ttl_seconds": int(os.getenv("SEEN_TOKENS_TTL_SECONDS", "3600")),  # Scanner skips tokens seen within 1 hour
+    "dedup_db_path": os.getenv("DEDUP_DB_PATH", "data/dedup.sqlite3"),              # Empty to keep dedup in memory only
+    "dedup_purge_interval_seconds": int(os.getenv("DEDUP_PURGE_INTERVAL_SECONDS", "600")),
+    "dedup_front_cache_size": int(os.getenv("DEDUP_FRONT_CACHE_SIZE", "50000")),     # Exact keys kept in memory
+    "dedup_bloom_capacity": int(os.getenv("DEDUP_BLOOM_CAPACITY", "2000000")),       # Keys expected per dedup window
+    "dedup_bloom_error_rate": float(os.getenv("DEDUP_BLOOM_ERROR_RATE", "0.001")),   # Target false positive rate
+    "dedup_bloom_generations": int(os.getenv("DEDUP_BLOOM_GENERATIONS", "4")),       # Rotating filter slices
     
     # API settings
     "max_retries": int(os.getenv("MAX_RETRIES", "3")),
     "request_timeout": int(os.getenv("REQUEST_TIMEOUT", "30")),
-    "rate_limit_delay": float(os.getenv("RATE_LIMIT_DELAY", "1.0")),
+    "rate_limit_delay": float(os.getenv("RATE_LIMIT_DELAY", "1.0")),          # Default per-host refill: 1 request per delay
+    "rate_limit_burst": int(os.getenv("RATE_LIMIT_BURST", "5")),              # Default per-host burst size
+    "circuit_failure_threshold": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "2")),       # Failed fetches before skipping
+    "circuit_base_backoff_seconds": float(os.getenv("CIRCUIT_BASE_BACKOFF", "60")),      # First open period
+    "circuit_max_backoff_seconds": float(os.getenv("CIRCUIT_MAX_BACKOFF", "1800")),      # Cap for repeated trips
+    "circuit_backoff_jitter": float(os.getenv("CIRCUIT_BACKOFF_JITTER", "0.2")),         # +/-20% randomisation
+    "circuit_health_alpha": float(os.getenv("CIRCUIT_HEALTH_ALPHA", "0.3")),             # Health score EWMA weight
+    "telegram_chat_rate": float(os.getenv("TELEGRAM_CHAT_RATE", "0.33")),     # Messages/second per chat (20/min for groups)
+    "telegram_chat_burst": int(os.getenv("TELEGRAM_CHAT_BURST", "3")),
+    "telegram_outbox_workers": int(os.getenv("TELEGRAM_OUTBOX_WORKERS", "4")),  # Background senders
+    "telegram_outbox_size": int(os.getenv("TELEGRAM_OUTBOX_SIZE", "1000")),     # Max queued alerts
+    "telegram_max_send_attempts": int(os.getenv("TELEGRAM_MAX_SEND_ATTEMPTS", "5")),       # Give up after repeated 429s
+    "telegram_pool_size": int(os.getenv("TELEGRAM_POOL_SIZE", "8")),                       # Keep-alive connections to Telegram
+    "telegram_connect_timeout": float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", "5")),         # Seconds
+    "telegram_read_timeout": float(os.getenv("TELEGRAM_READ_TIMEOUT", "20")),              # Seconds
+    "telegram_default_retry_after": int(os.getenv("TELEGRAM_DEFAULT_RETRY_AFTER", "5")),   # When a 429 has no retry_after
+    "max_concurrent_requests": int(os.getenv("MAX_CONCURRENT_REQUESTS", "8")),  # Fetch worker threads
+    "max_requests_per_host": int(os.getenv("MAX_REQUESTS_PER_HOST", "4")),      # In-flight requests per API host
+    "pipeline_buffer_size": int(os.getenv("PIPELINE_BUFFER_SIZE", "4")),       # Source responses buffered ahead of filtering
+    "dexscreener_batch_size": int(os.getenv("DEXSCREENER_BATCH_SIZE", "30")),   # Addresses per /tokens request (API max 30)
+    "market_data_cache_ttl_seconds": int(os.getenv("MARKET_DATA_CACHE_TTL_SECONDS", "90")),  # Reuse market data for 90s
+    "market_data_cache_size": int(os.getenv("MARKET_DATA_CACHE_SIZE", "5000")),             # Max cached tokens
+    "conditional_requests": os.getenv("CONDITIONAL_REQUESTS", "true").lower() == "true",     # Skip unchanged source responses
+    "response_reuse_seconds": float(os.getenv("RESPONSE_REUSE_SECONDS", "300")),            # Reprocess unchanged responses this often
+    "pump_fun_incremental": os.getenv("PUMP_FUN_INCREMENTAL", "true").lower() == "true",     # Only ingest new launches
+    "pump_fun_stream": os.getenv("PUMP_FUN_STREAM", "false").lower() == "true",  # Ingest launches over WebSocket
+    "pump_fun_stream_url": os.getenv("PUMP_FUN_STREAM_URL", "wss://pumpportal.fun/api/data"),
+    "pump_fun_stream_subscribe_method": os.getenv("PUMP_FUN_STREAM_SUBSCRIBE_METHOD", "subscribeNewToken"),
+    "pump_fun_stream_reconnect_base_seconds": float(os.getenv("PUMP_FUN_STREAM_RECONNECT_BASE_SECONDS", "1")),
+    "pump_fun_stream_reconnect_max_seconds": float(os.getenv("PUMP_FUN_STREAM_RECONNECT_MAX_SECONDS", "60")),
+    "sol_price_usd": float(os.getenv("SOL_PRICE_USD", "0")),        # Converts streamed SOL market caps; 0 = look up on DexScreener
+    "pump_fun_max_pages": int(os.getenv("PUMP_FUN_MAX_PAGES", "5")),                         # Pages to catch up per scan
+}
+
+# Token bucket limits per API host: sustained requests/second and burst size
+HOST_RATE_LIMITS = {
+    'frontend-api.pump.fun': {
+        'rate': float(os.getenv("PUMP_FUN_RATE", "5")),
+        'burst': int(os.getenv("PUMP_FUN_BURST", "10")),
+    },
+    'api.dexscreener.com': {
+        'rate': float(os.getenv("DEXSCREENER_RATE", "4")),     # API allows 300/min on /tokens, 60/min on profiles
+        'burst': int(os.getenv("DEXSCREENER_BURST", "10")),
+    },
+    'ipfs.io': {
+        'rate': float(os.getenv("IPFS_RATE", "10")),            # Streamed coins' metadata, one request per launch
+        'burst': int(os.getenv("IPFS_BURST", "20")),
+    },
+    'api.telegram.org': {
+        'rate': float(os.getenv("TELEGRAM_RATE", "30")),       # Global bot limit, per-chat limit is separate
+        'burst': int(os.getenv("TELEGRAM_BURST", "30")),
+    },
 }
 
 # API endpoints configuration
@@ -97,3 +173,22 @@ DEFAULT_HEADERS = {
     'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1',
 }
+
+# SCAN_INTERVAL_SECONDS takes precedence so intervals can go below a minute
+if CONFIG["scan_interval_seconds"] <= 0:
+    CONFIG["scan_interval_seconds"] = CONFIG["scan_interval_minutes"] * 60
+
+# With adaptive polling the scheduler ticks at the fastest poll interval and each tick
+# fetches only the endpoints that are due; scan_interval_seconds is their starting interval
+CONFIG["scan_tick_seconds"] = (CONFIG["poll_min_interval_seconds"] if CONFIG["adaptive_polling"]
+                               else CONFIG["scan_interval_seconds"])
+
+# Leave some of every tick free so a slow scan can't run into the next one
+if CONFIG["scan_deadline_seconds"] <= 0:
+    CONFIG["scan_deadline_seconds"] = CONFIG["scan_tick_seconds"] * 0.9
+
+# By default the adaptive poller spends the same number of requests as fixed-interval scans
+if CONFIG["poll_budget_per_minute"] <= 0:
+    CONFIG["poll_budget_per_minute"] = (
+        (len(PUMP_FUN_ENDPOINTS) + len(DEXSCREENER_ENDPOINTS)) * 60 / CONFIG["scan_interval_seconds"]
+    )
@@ -0,0 +1,351 @@
+"""
+Dedup Store - Membership sets whose entries expire individually
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+from config import CONFIG
+from bloom_filter import RotatingBloomFilter, token_key
+
+logger = logging.getLogger(__name__)
+
+# Keys read per query when seeding a Bloom filter from disk
+LIVE_KEYS_CHUNK_SIZE = 10000
+
+# Columns added to alert_history after the table was first shipped
+ALERT_HISTORY_COLUMNS = [
+    ('message_id', 'INTEGER'),
+    ('market_cap', 'REAL'),
+    ('liquidity_usd', 'REAL'),
+    ('volume_24h', 'REAL'),
+]
+
+
+class ExpiringSet:
+    """Set where every key expires ttl_seconds after it was added.
+
+    Keys live in an insertion-ordered dict. With a single TTL, insertion order is
+    also expiry order, so expired keys are always at the front and each one is
+    popped exactly once (amortized O(1) per add).
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._expiry: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, ttl_seconds: Optional[float] = None):
+        """Add a key, restarting its TTL if it was already present.
+
+        A shorter ttl_seconds (e.g. the remaining TTL of a key loaded from disk) is
+        still checked on lookup, but the key is only swept once the keys ahead of it expire.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            # Re-insert so the key moves to the back of the expiry order
+            self._expiry.pop(key, None)
+            self._expiry[key] = now + ttl
+            # When bounded, drop the oldest keys first
+            if self.max_size is not None:
+                while len(self._expiry) > self.max_size:
+                    del self._expiry[next(iter(self._expiry))]
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._expiry.pop(key, None)
+
+    def expire(self) -> int:
+        """Drop every expired key, returning how many were removed"""
+        with self._lock:
+            return self._expire(time.monotonic())
+
+    def _expire(self, now: float) -> int:
+        expired = []
+        for key, expires_at in self._expiry.items():
+            if expires_at > now:
+                break
+            expired.append(key)
+        for key in expired:
+            del self._expiry[key]
+        return len(expired)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expires_at = self._expiry.get(key)
+            if expires_at is None:
+                return False
+            now = time.monotonic()
+            if expires_at <= now:
+                self._expire(now)
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
+
+
+class DedupDatabase:
+    """SQLite store (WAL mode) for dedup keys and alert history, opened on first use"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database lazily so startup never waits on disk"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dedup_keys ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alert_history ("
+                " chat_id TEXT NOT NULL, token_id TEXT NOT NULL, sent_at REAL NOT NULL,"
+                " PRIMARY KEY (chat_id, token_id)) WITHOUT ROWID"
+            )
+            self._migrate_alert_history(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS alert_history_token ON alert_history (token_id)")
+            self._conn = conn
+            logger.info(f"Opened dedup store at {self.path}")
+        return self._conn
+
+    def _migrate_alert_history(self, conn: sqlite3.Connection):
+        """Add the columns edit-in-place needs to databases created before it existed"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(alert_history)")}
+        for column, column_type in ALERT_HISTORY_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE alert_history ADD COLUMN {column} {column_type}")
+
+    def get_expiry(self, namespace: str, key: str) -> Optional[float]:
+        """Wall-clock expiry of a live key, or None if absent or expired"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT expires_at FROM dedup_keys WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, namespace: str, key: str, expires_at: float):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO dedup_keys (namespace, key, expires_at) VALUES (?, ?, ?)",
+                (namespace, key, expires_at)
+            )
+
+    def discard(self, namespace: str, key: str):
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM dedup_keys WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def iter_live_keys(self, namespace: str, chunk_size: int = LIVE_KEYS_CHUNK_SIZE) -> Iterator[str]:
+        """Stream every unexpired key in a namespace, chunk_size keys per query.
+
+        Pages along the primary key, so memory stays bounded by one chunk and the
+        lock is released between chunks rather than held for the whole window.
+        """
+        now = time.time()
+        last_key = ''
+        while True:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT key FROM dedup_keys WHERE namespace = ? AND key > ? AND expires_at > ?"
+                    " ORDER BY key LIMIT ?",
+                    (namespace, last_key, now, chunk_size)
+                ).fetchall()
+            for (key,) in rows:
+                yield key
+            if len(rows) < chunk_size:
+                return
+            last_key = rows[-1][0]
+
+    def purge_expired(self) -> int:
+        """Delete expired dedup keys, returning how many were removed"""
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM dedup_keys WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def record_alert(self, chat_id: str, token_id: str, message_id: Optional[int] = None,
+                     market_cap: float = 0.0, liquidity_usd: float = 0.0, volume_24h: float = 0.0):
+        """Remember that a token was alerted to a chat, with the message and figures it showed"""
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO alert_history"
+                " (chat_id, token_id, sent_at, message_id, market_cap, liquidity_usd, volume_24h)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chat_id, token_id, time.time(), message_id, market_cap, liquidity_usd, volume_24h)
+            )
+
+    def update_alert_figures(self, chat_id: str, token_id: str, market_cap: float,
+                             liquidity_usd: float, volume_24h: float):
+        """Store the figures an edited alert now shows"""
+        with self._lock:
+            self._connection().execute(
+                "UPDATE alert_history SET market_cap = ?, liquidity_usd = ?, volume_24h = ?"
+                " WHERE chat_id = ? AND token_id = ?",
+                (market_cap, liquidity_usd, volume_24h, chat_id, token_id)
+            )
+
+    def get_alerts(self, token_id: str, since: float) -> List[Tuple]:
+        """(chat_id, message_id, market_cap, liquidity_usd, volume_24h) of editable alerts sent after since"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT chat_id, message_id, market_cap, liquidity_usd, volume_24h FROM alert_history"
+                " WHERE token_id = ? AND sent_at > ? AND message_id IS NOT NULL",
+                (token_id, since)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PersistentExpiringSet:
+    """ExpiringSet backed by a DedupDatabase namespace so entries survive restarts.
+
+    Lookups go through three layers: a bounded in-memory cache of 16-byte key
+    digests, a rotating Bloom filter that answers most misses without touching
+    disk, and finally SQLite as the exact store for Bloom positives.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: float, database: 'DedupDatabase'):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.database = database
+        self._front = ExpiringSet(ttl_seconds, max_size=CONFIG["dedup_front_cache_size"])
+        self._bloom = RotatingBloomFilter(
+            capacity=CONFIG["dedup_bloom_capacity"],
+            error_rate=CONFIG["dedup_bloom_error_rate"],
+            window_seconds=ttl_seconds,
+            generations=CONFIG["dedup_bloom_generations"]
+        )
+        self._bloom_loaded = False
+        self._load_lock = threading.Lock()
+        self._last_purge = time.monotonic()
+
+    def _ensure_bloom_loaded(self):
+        """Seed the Bloom filter from disk on first use so restarts keep their history"""
+        if self._bloom_loaded:
+            return
+        with self._load_lock:
+            if self._bloom_loaded:
+                return
+            try:
+                loaded = 0
+                for key in self.database.iter_live_keys(self.namespace):
+                    self._bloom.add(token_key(key))
+                    loaded += 1
+                logger.info(f"Loaded {loaded} {self.namespace} dedup keys into Bloom filter")
+            except sqlite3.Error as e:
+                logger.error(f"Error loading dedup keys for {self.namespace}: {e}")
+            self._bloom_loaded = True
+
+    def add(self, key: str):
+        self._ensure_bloom_loaded()
+        digest = token_key(key)
+        self._front.add(digest)
+        self._bloom.add(digest)
+        try:
+            self.database.add(self.namespace, key, time.time() + self.ttl_seconds)
+        except sqlite3.Error as e:
+            logger.error(f"Error persisting dedup key {key}: {e}")
+
+    def discard(self, key: str):
+        """Forget a key; its Bloom bits stay set, but the database has the final say on a hit"""
+        self._front.discard(token_key(key))
+        try:
+            self.database.discard(self.namespace, key)
+        except sqlite3.Error as e:
+            logger.error(f"Error discarding dedup key {key}: {e}")
+
+    def __contains__(self, key: str) -> bool:
+        digest = token_key(key)
+        if digest in self._front:
+            return True
+
+        # A Bloom miss is definitive, so most new tokens never reach SQLite
+        self._ensure_bloom_loaded()
+        if digest not in self._bloom:
+            return False
+
+        try:
+            expires_at = self.database.get_expiry(self.namespace, key)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading dedup key {key}: {e}")
+            return False
+        if expires_at is None:
+            return False
+        self._front.add(digest, ttl_seconds=expires_at - time.time())
+        return True
+
+    def expire(self) -> int:
+        """Expire the front cache, and purge the database every dedup_purge_interval_seconds"""
+        removed = self._front.expire()
+        if time.monotonic() - self._last_purge >= min(self.ttl_seconds, CONFIG["dedup_purge_interval_seconds"]):
+            self._last_purge = time.monotonic()
+            try:
+                self.database.purge_expired()
+            except sqlite3.Error as e:
+                logger.error(f"Error purging dedup store: {e}")
+            stats = self.stats()
+            logger.info(f"Dedup {self.namespace} - Bloom keys: {stats['bloom_keys']}, "
+                        f"Bloom memory: {stats['bloom_bytes'] / 1e6:.1f}MB, "
+                        f"Est. false positive rate: {stats['false_positive_rate']:.4%}")
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'front_cache_keys': len(self._front),
+            'bloom_keys': len(self._bloom),
+            'bloom_bytes': self._bloom.memory_bytes(),
+            'false_positive_rate': self._bloom.estimated_false_positive_rate(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._front)
+
+
+_default_database: Optional[DedupDatabase] = None
+_default_database_lock = threading.Lock()
+
+
+def get_default_database() -> Optional[DedupDatabase]:
+    """Shared database at CONFIG["dedup_db_path"], or None when persistence is disabled"""
+    global _default_database
+    if not CONFIG["dedup_db_path"]:
+        return None
+    with _default_database_lock:
+        if _default_database is None:
+            _default_database = DedupDatabase(CONFIG["dedup_db_path"])
+        return _default_database
+
+
+def create_dedup_set(namespace: str, ttl_seconds: float):
+    """Persistent dedup set when a database is configured, in-memory otherwise"""
+    database = get_default_database()
+    if database is None:
+        return ExpiringSet(ttl_seconds)
+    return PersistentExpiringSet(namespace, ttl_seconds, database)
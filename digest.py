@@ -0,0 +1,116 @@
+"""
+Digest - Packs many compact token entries into as few Telegram messages as possible
+"""
+
+import logging
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from config import CONFIG
+from models import Token
+from message_renderer import default_renderer
+from utils import get_risk_level
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects message text longer than this many UTF-16 code units
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Order risk groups from most to least dangerous
+RISK_ORDER = ["🔴 EXTREME", "🟠 HIGH", "🟡 MEDIUM", "🟢 LOW", "❓ UNKNOWN"]
+
+
+def message_length(text: str) -> int:
+    """Length as Telegram counts it, so emoji and other astral characters count twice"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _chain_group(token: Token) -> str:
+    return default_renderer.template(token.chain).name
+
+
+GROUPERS: Dict[str, Callable[[Token], str]] = {
+    'chain': _chain_group,
+    'risk': get_risk_level,
+    'none': lambda token: '',
+}
+
+
+def format_digest_entry(token: Token, now: float = None) -> str:
+    """One or two compact lines per token: headline numbers plus chart and community links"""
+    return default_renderer.render_compact(token, now)
+
+
+def group_tokens(tokens: Sequence[Token], group_by: str) -> List[Tuple[str, List[Token]]]:
+    """Split tokens into (label, tokens) groups, keeping first-seen order within each group"""
+    grouper = GROUPERS.get(group_by)
+    if grouper is None:
+        logger.warning(f"Unknown digest grouping '{group_by}', not grouping")
+        grouper = GROUPERS['none']
+
+    groups: Dict[str, List[Token]] = {}
+    for token in tokens:
+        groups.setdefault(grouper(token), []).append(token)
+
+    if group_by == 'risk':
+        return sorted(groups.items(), key=lambda item: RISK_ORDER.index(item[0]) if item[0] in RISK_ORDER else len(RISK_ORDER))
+    return list(groups.items())
+
+
+def pack_digests(tokens: Sequence[Token], group_by: str = None,
+                 max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[Tuple[str, List[Token]]]:
+    """Bin-pack token entries into messages no longer than max_length.
+
+    Entries are appended in group order and a new message starts only when the next
+    entry would not fit, so every message is filled before the next one opens. A group
+    that spills over repeats its header in the next message. Returns (text, tokens)
+    pairs so callers know which tokens each message covers.
+    """
+    group_by = group_by or CONFIG["digest_group_by"]
+    now = time.time()
+    title = f"🚀 **{len(tokens)} NEW TOKENS**"
+
+    messages: List[Tuple[str, List[Token]]] = []
+    parts: List[str] = []
+    covered: List[Token] = []
+    length = 0
+
+    def flush():
+        nonlocal parts, covered, length
+        if covered:
+            messages.append(("\n".join(parts), covered))
+        parts, covered, length = [], [], 0
+
+    def append(text: str):
+        nonlocal length
+        # +1 for the newline that joins it to the previous part
+        length += message_length(text) + (1 if parts else 0)
+        parts.append(text)
+
+    for label, group in group_tokens(tokens, group_by):
+        header = f"\n**{label}**" if label else ""
+        header_written = False
+        for token in group:
+            entry = format_digest_entry(token, now)
+            needed = message_length(entry) + 1
+            if not header_written and header:
+                needed += message_length(header) + 1
+
+            if parts and length + needed > max_length:
+                flush()
+                header_written = False
+
+            if not parts:
+                append(title if not messages else f"{title} (cont.)")
+            if not header_written and header:
+                append(header)
+                header_written = True
+
+            if length + message_length(entry) + 1 > max_length:
+                # A single oversized entry: keep its headline line only
+                entry = entry.split("\n", 1)[0][:max(0, max_length - length - 1)]
+            append(entry)
+            covered.append(token)
+
+    flush()
+    return messages
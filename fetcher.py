@@ -0,0 +1,248 @@
+"""
+Concurrent Fetcher - Runs HTTP requests in parallel with per-host concurrency limits
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import CONFIG
+from rate_limiter import RateLimiter, shared_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised instead of starting a request that could not finish before the scan deadline"""
+
+
+class Deadline:
+    """A fixed point on the monotonic clock that a unit of work must finish by"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class ResponseState:
+    """Validators and body digest of the last processed response for one endpoint, with its counters"""
+
+    __slots__ = ('etag', 'last_modified', 'body_digest', 'reuse_until',
+                 'requests', 'not_modified', 'unchanged_body', 'changed')
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.body_digest: Optional[bytes] = None
+        self.reuse_until = 0.0          # Until then an unchanged response may be skipped
+        self.requests = 0
+        self.not_modified = 0
+        self.unchanged_body = 0
+        self.changed = 0
+
+
+class ConcurrentFetcher:
+    """Fans requests out over a thread pool while capping in-flight requests per host"""
+
+    def __init__(self, session: requests.Session, max_workers: int = None, per_host_limit: int = None,
+                 rate_limiter: RateLimiter = None):
+        self.session = session
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.max_workers = max_workers or CONFIG["max_concurrent_requests"]
+        self.per_host_limit = per_host_limit or CONFIG["max_requests_per_host"]
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._responses: Dict[str, ResponseState] = {}
+
+        # Size the keep-alive pool so concurrent workers don't discard connections
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _remaining(self, url: str, deadline: Optional[Deadline]) -> Optional[float]:
+        """Seconds left before the deadline, raising once there are none"""
+        if deadline is None:
+            return None
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Scan deadline passed before requesting {url}")
+        return remaining
+
+    @contextmanager
+    def _host_slot(self, url: str, deadline: Optional[Deadline]):
+        """Hold one of the per-host concurrency slots for the duration of a request"""
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+        remaining = self._remaining(url, deadline)
+        if not slot.acquire(timeout=remaining):
+            raise DeadlineExceeded(f"Scan deadline passed waiting for a {host} slot")
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def get(self, url: str, deadline: Optional[Deadline] = None, **kwargs) -> requests.Response:
+        """Perform a GET request once the host has rate budget and a free slot.
+
+        With a deadline, waits for budget or a slot never run past it and the request
+        timeout is cut to the time remaining.
+        """
+        # Wait on the bucket before taking a slot so throttled requests don't block others
+        if self.rate_limiter.acquire_url(url, max_wait=self._remaining(url, deadline)) is None:
+            raise DeadlineExceeded(f"Scan deadline would pass waiting for {url} rate budget")
+        with self._host_slot(url, deadline):
+            remaining = self._remaining(url, deadline)
+            if remaining is not None:
+                timeout = kwargs.get('timeout')
+                kwargs['timeout'] = remaining if timeout is None else min(timeout, remaining)
+            return self.session.get(url, **kwargs)
+
+    def get_if_changed(self, url: str, key: str = None, deadline: Optional[Deadline] = None,
+                       **kwargs) -> Tuple[requests.Response, bool]:
+        """GET url, reporting whether the content differs from the last response processed under key.
+
+        Sends If-None-Match/If-Modified-Since when the server gave validators, and
+        hashes 200 bodies, so a 304 or a byte-identical body comes back as unchanged.
+        Only responses the caller confirmed with mark_processed() count as a baseline,
+        and once reuse_until passes the request goes out unconditionally and counts as
+        changed, so time-dependent processing (age windows) is rerun periodically.
+        """
+        key = key or url
+        with self._lock:
+            state = self._responses.get(key)
+            if state is None:
+                state = ResponseState()
+                self._responses[key] = state
+            reusable = CONFIG["conditional_requests"] and time.monotonic() < state.reuse_until
+            state.requests += 1
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if reusable:
+            if state.etag:
+                headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                headers['If-Modified-Since'] = state.last_modified
+        response = self.get(url, deadline=deadline, headers=headers, **kwargs)
+
+        if response.status_code == 304 and reusable:
+            with self._lock:
+                state.not_modified += 1
+            return response, False
+        if response.status_code != 200:
+            return response, True
+
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        with self._lock:
+            if reusable and digest == state.body_digest:
+                state.unchanged_body += 1
+                return response, False
+            state.etag = response.headers.get('ETag')
+            state.last_modified = response.headers.get('Last-Modified')
+            state.body_digest = digest
+            state.reuse_until = 0.0
+            state.changed += 1
+        return response, True
+
+    def mark_processed(self, key: str, reuse_seconds: float):
+        """Let responses identical to the last one under key be skipped for reuse_seconds"""
+        with self._lock:
+            state = self._responses.get(key)
+            if state is not None:
+                state.reuse_until = time.monotonic() + reuse_seconds
+
+    def response_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                key: {
+                    'requests': state.requests,
+                    'not_modified': state.not_modified,
+                    'unchanged_body': state.unchanged_body,
+                    'changed': state.changed,
+                }
+                for key, state in self._responses.items()
+            }
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any], default: Any = None) -> List[Any]:
+        """Run fn over items concurrently, returning results in input order.
+
+        Each call gets its own short-lived pool so nested fan-outs (e.g. market data
+        enrichment inside a source fetch) can never starve each other of workers;
+        actual network concurrency is bounded by the per-host slots in get().
+        """
+        items = list(items)
+        if not items:
+            return []
+        if len(items) == 1:
+            return [self._call(fn, items[0], default)]
+
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+            futures = [pool.submit(self._call, fn, item, default) for item in items]
+            return [future.result() for future in futures]
+
+    def iter_completed(self, fn: Callable[[Any], Any], items: Iterable[Any], default: Any = None,
+                       buffer_size: int = None, deadline: Optional[Deadline] = None) -> Iterator[Tuple[Any, Any]]:
+        """Run fn over items concurrently, yielding (item, result) as each one finishes.
+
+        Results pass through a bounded queue, so workers block once the consumer falls
+        buffer_size results behind. Closing the generator early, or reaching the
+        deadline, abandons the rest: results that finish later are dropped, so fn
+        should leave state that depends on its result being used to the consumer.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        results: queue.Queue = queue.Queue(maxsize=buffer_size or CONFIG["pipeline_buffer_size"])
+        closed = threading.Event()
+
+        def worker(item):
+            result = self._call(fn, item, default)
+            while not closed.is_set():
+                try:
+                    results.put((item, result), timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)), thread_name_prefix="fetch")
+        try:
+            for item in items:
+                pool.submit(worker, item)
+            for received in range(len(items)):
+                try:
+                    remaining = deadline.remaining() if deadline is not None else None
+                    yield results.get(timeout=remaining)
+                except queue.Empty:
+                    logger.warning(f"Deadline reached, abandoning {len(items) - received} unfinished fetches")
+                    return
+        finally:
+            closed.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _call(self, fn: Callable[[Any], Any], item: Any, default: Any) -> Any:
+        """Invoke fn and log rather than propagate failures"""
+        try:
+            return fn(item)
+        except Exception as e:
+            logger.error(f"Error in concurrent fetch for {item}: {e}")
+            return default
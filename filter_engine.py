@@ -0,0 +1,79 @@
+"""
+Filter Engine - Evaluates the token filtering criteria for a whole scan at once
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import CONFIG
+from models import Token
+
+logger = logging.getLogger(__name__)
+
+
+class CriteriaThresholds:
+    """Criteria bounds derived from CONFIG once per batch, for regular and Pump.fun candidate tokens"""
+
+    __slots__ = ('min_cap', 'max_cap', 'min_age', 'max_age', 'min_liquidity',
+                 'pump_min_cap', 'pump_max_cap', 'pump_max_age', 'pump_min_liquidity')
+
+    def __init__(self, config: Dict[str, Any]):
+        self.min_cap = config["min_market_cap"]
+        self.max_cap = config["max_market_cap"]
+        self.min_age = config["min_age_seconds"]
+        self.max_age = config["max_age_seconds"]
+        self.min_liquidity = config["min_liquidity"]
+
+        # More permissive bounds for Pump.fun candidates
+        self.pump_min_cap = max(1000, config["min_market_cap"] // 10)
+        self.pump_max_cap = config["max_market_cap"] * 5
+        self.pump_max_age = config["max_age_seconds"] * 7
+        self.pump_min_liquidity = config["min_liquidity"] // 5
+
+
+def criteria_mask(tokens: Sequence[Token], config: Optional[Dict[str, Any]] = None,
+                  now: Optional[float] = None) -> List[bool]:
+    """Return, for each token, whether it passes the market cap, age and liquidity criteria.
+
+    Zero market cap, liquidity or creation time means "unknown" and is not filtered on,
+    matching the per-token rules the scanner has always applied.
+    """
+    if not tokens:
+        return []
+
+    try:
+        thresholds = CriteriaThresholds(config or CONFIG)
+        now = time.time() if now is None else now
+        return _token_mask(tokens, thresholds, now)
+
+    except Exception as e:
+        logger.error(f"Error filtering tokens: {e}")
+        return [False] * len(tokens)
+
+
+def _token_mask(tokens: Sequence[Token], thresholds: CriteriaThresholds, now: float) -> List[bool]:
+    """Evaluate the criteria in one tight loop against bounds computed once per batch.
+
+    Every bound is precomputed for both token classes, including the age window as
+    a range of creation times, so each token costs a few attribute reads and compares.
+    """
+    t = thresholds
+    newest = now - t.min_age
+    regular = (t.min_cap, t.max_cap, now - t.max_age, t.min_liquidity)
+    pump = (t.pump_min_cap, t.pump_max_cap, now - t.pump_max_age, t.pump_min_liquidity)
+
+    mask = []
+    append = mask.append
+    for token in tokens:
+        min_cap, max_cap, oldest, min_liquidity = pump if token.is_pump_candidate else regular
+        market_cap = token.market_cap
+        created = token.created_timestamp
+        liquidity = token.liquidity_usd
+        append(
+            bool(token.address and token.name and token.symbol)
+            and (market_cap <= 0 or min_cap <= market_cap <= max_cap)
+            and (created == 0 or oldest <= created <= newest)
+            and (liquidity <= 0 or liquidity >= min_liquidity)
+        )
+    return mask
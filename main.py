@@ -8,91 +8,65 @@ import asyncio
 import logging
 import signal
 import sys
-import time
-import threading
-from datetime import datetime
-import schedule
 
 from config import CONFIG, TELEGRAM_TOKEN, CHAT_ID
-from token_scanner import TokenScanner
-from telegram_bot import TelegramNotifier
+from runtime import BotRuntime
+from scheduler import IntervalScheduler
 from utils import setup_logging
 
 # Global variables for graceful shutdown
-running = True
-scanner_thread = None
+runtime = None
+scheduler = None
+stream = None
 
-def signal_handler(signum, frame):
+def signal_handler():
     """Handle shutdown signals gracefully"""
-    global running
     logger.info("Received shutdown signal, stopping bot...")
-    running = False
-    if scanner_thread:
-        scanner_thread.join(timeout=5)
-    sys.exit(0)
+    if runtime:
+        runtime.stop()
+    if scheduler:
+        scheduler.stop()
+    if stream:
+        stream.stop()
 
 def scan_and_notify():
     """Main scanning and notification function"""
-    if not running:
+    if runtime is None:
         return
         
-    try:
-        logger.info("Starting token scan...")
-        
-        # Initialize scanner and notifier
-        scanner = TokenScanner()
-        notifier = TelegramNotifier(TELEGRAM_TOKEN, CHAT_ID)
-        
-        # Scan for new tokens
-        tokens = scanner.scan_all_sources()
-        
-        if not tokens:
-            logger.info("No tokens found")
-            return
-            
-        logger.info(f"Found {len(tokens)} tokens to process")
-        
-        # Filter and send notifications
-        sent_count = 0
-        for token in tokens[:CONFIG["max_tokens_per_scan"]]:
-            if not running:
-                break
-                
-            try:
-                if notifier.should_notify(token) and notifier.send_token_alert(token):
-                    sent_count += 1
-                    time.sleep(2)  # Rate limit notifications
-            except Exception as e:
-                logger.error(f"Error processing token {token.get('address', 'unknown')}: {e}")
-                continue
-                
-        logger.info(f"Sent {sent_count} notifications")
-        
-    except Exception as e:
-        logger.error(f"Error in scan_and_notify: {e}")
+    # The runtime lives for the whole process so sessions and dedup state carry over
+    runtime.scan_and_notify()
 
-def run_scheduler():
-    """Run the scheduler in a separate thread"""
-    logger.info("Starting scheduler thread...")
-    while running:
-        try:
-            schedule.run_pending()
-            time.sleep(2)
-        except Exception as e:
-            logger.error(f"Error in scheduler: {e}")
-            time.sleep(10)
+async def run_bot():
+    """Run scans on the interval scheduler until a shutdown signal arrives"""
+    global scheduler, stream
+    
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, signal_handler)
+    
+    # The first tick fires immediately, which is the initial scan
+    scheduler = IntervalScheduler(scan_and_notify, CONFIG["scan_tick_seconds"])
+    logger.info(f"Bot started. Scanning every {CONFIG['scan_tick_seconds']} seconds...")
+    
+    # The WebSocket stream runs alongside the scheduled scans on the same loop
+    stream_task = None
+    if CONFIG["pump_fun_stream"]:
+        stream = runtime.create_stream()
+        stream_task = asyncio.create_task(stream.run())
+    
+    await scheduler.run()
+    if stream_task:
+        stream.stop()
+        await stream_task
 
 def main():
     """Main function"""
-    global scanner_thread, logger
+    global logger, runtime
     
     # Setup logging
     logger = setup_logging()
     
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     logger.info("Starting Pump.fun Token Scanner Bot...")
     logger.info(f"Configuration: {CONFIG}")
     
@@ -102,28 +76,17 @@ def main():
         sys.exit(1)
     
     try:
-        # Schedule scanning
-        schedule.every(CONFIG["scan_interval_minutes"]).minutes.do(scan_and_notify)
-        
-        # Run initial scan
-        logger.info("Running initial scan...")
-        scan_and_notify()
-        
-        # Start scheduler thread
-        scanner_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scanner_thread.start()
-        
-        logger.info(f"Bot started. Scanning every {CONFIG['scan_interval_minutes']} minutes...")
-        
-        # Keep main thread alive
-        while running:
-            time.sleep(1)
+        # Build the long-lived scanner/notifier runtime once
+        runtime = BotRuntime(TELEGRAM_TOKEN, CHAT_ID)
+        asyncio.run(run_bot())
             
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
+        if runtime:
+            runtime.close()
         logger.info("Bot stopped")
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+Message Renderer - Precompiled templates and a render cache for Telegram alert text
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import CONFIG, CHAIN_CONFIGS
+from cache import TTLCache, MISSING
+from models import Token
+from utils import format_market_cap
+
+logger = logging.getLogger(__name__)
+
+
+def format_usd(num: float) -> str:
+    """Compact dollar amount: $1.23M, $4.5K or $6.78"""
+    if num >= 1e6:
+        return f"${num/1e6:.2f}M"
+    elif num >= 1e3:
+        return f"${num/1e3:.1f}K"
+    else:
+        return f"${num:.2f}"
+
+
+def format_age(age_seconds: float) -> str:
+    """Token age as 1d 2h 3m, 2h 3m 4s or 3m 4s"""
+    days, rest = divmod(int(age_seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m {seconds}s"
+    return f"{minutes}m {seconds}s"
+
+
+# Characters legacy Markdown reads as formatting, backslash-escaped
+_MARKDOWN_ESCAPES = str.maketrans({char: f"\\{char}" for char in '_*`['})
+
+
+def escape_markdown(text: str) -> str:
+    """Escape free text such as token names so it can't break the message's Markdown"""
+    return text.translate(_MARKDOWN_ESCAPES)
+
+
+def _change_emoji(price_change: float) -> str:
+    return ("🚀" if price_change > 5 else
+            "🟢" if price_change > 0 else "💥" if price_change <
+            -10 else "🔴" if price_change < 0 else "🟡")
+
+
+class ChainTemplate:
+    """Everything about a chain the alert needs, resolved once instead of per message"""
+
+    __slots__ = ('name', 'chart_url', 'chart_prefix', 'dex_prefix', 'explorer_prefix')
+
+    def __init__(self, chain: str, chain_config: Dict[str, str]):
+        self.name = chain_config.get('name', f'⛓️ {chain.title()}')
+        # Only chains listed in CHAIN_CONFIGS get chart, trade and explorer links
+        self.chart_url = chain_config.get('chart_url', '') if chain_config else None
+        self.chart_prefix = f"[Chart]({self.chart_url}" if chain_config else None
+        self.dex_prefix = f"[Trade]({chain_config['dex_url']}" if chain_config.get('dex_url') else None
+        self.explorer_prefix = f"[Explorer]({chain_config['explorer_url']}" if chain_config.get('explorer_url') else None
+
+    def links(self, address: str) -> List[str]:
+        links = []
+        if self.chart_prefix is not None:
+            links.append(f"{self.chart_prefix}{address}) 📈")
+        if self.dex_prefix is not None:
+            links.append(f"{self.dex_prefix}{address}) 💹")
+        if self.explorer_prefix is not None:
+            links.append(f"{self.explorer_prefix}{address}) 🔍")
+        return links
+
+
+class MessageRenderer:
+    """Renders alert text from per-chain templates, caching everything except the token's age.
+
+    Token is frozen and hashable, so the token itself is the cache key: any change in
+    its content is a new key, and an unchanged token re-renders by joining the cached
+    halves around a freshly formatted age.
+    """
+
+    def __init__(self, chain_configs: Dict[str, Dict[str, str]] = None, cache_size: int = None):
+        self.chain_configs = CHAIN_CONFIGS if chain_configs is None else chain_configs
+        self._templates: Dict[str, ChainTemplate] = {
+            chain: ChainTemplate(chain, chain_config) for chain, chain_config in self.chain_configs.items()
+        }
+        self._cache = TTLCache(
+            maxsize=cache_size or CONFIG["render_cache_size"],
+            ttl_seconds=CONFIG["seen_tokens_ttl_seconds"]
+        )
+
+    def template(self, chain: str) -> ChainTemplate:
+        template = self._templates.get(chain)
+        if template is None:
+            # Unknown chains are rare; build their template on first sight and keep it
+            template = ChainTemplate(chain, {})
+            self._templates[chain] = template
+        return template
+
+    def render_alert(self, token: Token, now: Optional[float] = None) -> str:
+        """Full alert message for one token"""
+        parts = self._cache.get(('alert', token))
+        if parts is MISSING:
+            parts = self._build_alert(token)
+            self._cache.set(('alert', token), parts)
+        return self._with_age(parts, token, now)
+
+    def render_compact(self, token: Token, now: Optional[float] = None) -> str:
+        """One or two line digest entry for one token"""
+        parts = self._cache.get(('compact', token))
+        if parts is MISSING:
+            parts = self._build_compact(token)
+            self._cache.set(('compact', token), parts)
+        return self._with_age(parts, token, now, unknown="?")
+
+    def _with_age(self, parts: Tuple[str, str], token: Token, now: Optional[float], unknown: str = "Unknown") -> str:
+        """Age is the only part that changes between renders, so it is formatted every time"""
+        head, tail = parts
+        if token.created_timestamp:
+            now = time.time() if now is None else now
+            age = format_age(now - token.created_timestamp)
+        else:
+            age = unknown
+        return f"{head}{age}{tail}"
+
+    def _build_alert(self, token: Token) -> Tuple[str, str]:
+        """Text before and after the age slot of a full alert"""
+        template = self.template(token.chain)
+        address = token.address
+        short_address = f"{address[:6]}...{address[-4:]}"
+        price_change = token.price_change_24h
+
+        head = f"""🚀 **NEW TOKEN: {escape_markdown(token.name)} (${escape_markdown(token.symbol)})**
+
+    **Chain:** {template.name}
+    **Age:** """
+        tail = f"""
+    **Contract:** `{short_address}`
+
+    **Price:** ${token.price_usd:.8f} {_change_emoji(price_change)} {price_change:.2f}%
+    **Market Cap:** {format_usd(token.market_cap)} 💰
+    **Liquidity:** {format_usd(token.liquidity_usd)} 💧
+    **Volume 24h:** {format_usd(token.volume_24h)} 📊
+
+    **Links:**"""
+
+        links = []
+        if token.website:
+            links.append(f"[Website]({token.website}) 🌐")
+        if token.telegram:
+            links.append(f"[Telegram]({token.telegram}) 📱")
+        if token.twitter:
+            links.append(f"[Twitter]({token.twitter}) 🐦")
+        links.extend(template.links(address))
+        if links:
+            tail += f"\n{' | '.join(links)}"
+
+        footer = f"Source: {token.source.title()}"
+        if token.market_cap < 50000:  # Under $50k market cap
+            footer += " | ⚠️ **HIGH RISK - Do Your Own Research!**"
+        tail += f"\n\n{footer}"
+        return head, tail
+
+    def _build_compact(self, token: Token) -> Tuple[str, str]:
+        """Text before and after the age slot of a digest entry"""
+        change = token.price_change_24h
+        change_emoji = "🟢" if change > 0 else "🔴" if change < 0 else "🟡"
+        head = (f"• *{escape_markdown(token.name)}* (${escape_markdown(token.symbol)}) · MC {format_market_cap(token.market_cap)} · "
+                f"Liq {format_market_cap(token.liquidity_usd)} · {change_emoji} {change:+.1f}% · ")
+
+        links = []
+        template = self.template(token.chain)
+        if template.chart_url:
+            links.append(f"[Chart]({template.chart_url}{token.address})")
+        if token.telegram:
+            links.append(f"[TG]({token.telegram})")
+        if token.twitter:
+            links.append(f"[X]({token.twitter})")
+        tail = f"\n   {' | '.join(links)}" if links else ""
+        return head, tail
+
+    def stats(self) -> Dict[str, float]:
+        return self._cache.stats()
+
+
+default_renderer = MessageRenderer()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Mock WebSocket server - Local stand-in for the Pump.fun new-token stream, for offline testing
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import websockets
+
+# Metadata JSON per mint, served over HTTP the way the live feed's `uri` points at IPFS
+METADATA: dict = {}
+
+
+def random_key(length: int) -> str:
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+def make_coin(sequence: int, metadata_base: str) -> dict:
+    """A synthetic create event shaped like PumpPortal's subscribeNewToken feed"""
+    symbol = ''.join(random.choices(string.ascii_uppercase, k=4))
+    mint = random_key(40) + 'pump'
+    v_sol = random.uniform(30, 80)
+    v_tokens = 1_073_000_000 * 30 / v_sol
+    # Like the live feed: no creation time, SOL-denominated market cap, socials only in the metadata
+    METADATA[mint] = {
+        'name': f"Mock Token {sequence}",
+        'symbol': symbol,
+        'description': "Synthetic launch for offline testing",
+        'twitter': f"https://x.com/mock{symbol.lower()}",
+        'website': f"https://mock{symbol.lower()}.example",
+    }
+    if random.random() < 0.7:
+        METADATA[mint]['telegram'] = f"https://t.me/mock{symbol.lower()}"
+    initial_buy = random.uniform(0, 3)
+    return {
+        'signature': random_key(88),
+        'mint': mint,
+        'traderPublicKey': random_key(44),
+        'txType': 'create',
+        'initialBuy': initial_buy * v_tokens / v_sol,
+        'solAmount': initial_buy,
+        'bondingCurveKey': random_key(44),
+        'vTokensInBondingCurve': v_tokens,
+        'vSolInBondingCurve': v_sol,
+        'marketCapSol': v_sol * 1_000_000_000 / v_tokens,
+        'name': f"Mock Token {sequence}",
+        'symbol': symbol,
+        'uri': f"{metadata_base}/metadata/{mint}.json",
+        'pool': 'pump',
+    }
+
+
+class MetadataHandler(BaseHTTPRequestHandler):
+    """Serves /metadata/<mint>.json for the coins already streamed"""
+
+    def do_GET(self):
+        mint = self.path.rsplit('/', 1)[-1].removesuffix('.json')
+        if not self.path.startswith('/metadata/') or mint not in METADATA:
+            self.send_error(404)
+            return
+        body = json.dumps(METADATA[mint]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metadata_server(host: str, port: int):
+    """Run the metadata HTTP server on a daemon thread"""
+    server = ThreadingHTTPServer((host, port), MetadataHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def serve_client(ws, interval: float, drop_after: int, metadata_base: str):
+    """Wait for a subscribe frame, then emit a new coin every interval seconds"""
+    request = json.loads(await ws.recv())
+    print(f"Client subscribed: {request}")
+    await ws.send(json.dumps({'message': 'Successfully subscribed to token creation events.'}))
+
+    sequence = 0
+    while True:
+        await asyncio.sleep(interval)
+        sequence += 1
+        coin = make_coin(sequence, metadata_base)
+        await ws.send(json.dumps(coin))
+        print(f"Sent {coin['symbol']} ({coin['mint']})")
+        if drop_after and sequence >= drop_after:
+            print(f"Dropping connection after {sequence} events")
+            await ws.close()
+            return
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Pump.fun launch events over WebSocket")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between events")
+    parser.add_argument('--drop-after', type=int, default=0,
+                        help="Close each connection after this many events to exercise reconnects (0 = never)")
+    parser.add_argument('--metadata-port', type=int, default=0,
+                        help="Port for the coin metadata HTTP server (default: --port + 1)")
+    args = parser.parse_args()
+
+    metadata_port = args.metadata_port or args.port + 1
+    metadata_base = f"http://{args.host}:{metadata_port}"
+    start_metadata_server(args.host, metadata_port)
+
+    async def handler(ws):
+        try:
+            await serve_client(ws, args.interval, args.drop_after, metadata_base)
+        except websockets.exceptions.ConnectionClosed:
+            print("Client disconnected")
+
+    async with websockets.serve(handler, args.host, args.port):
+        print(f"Mock Pump.fun stream on ws://{args.host}:{args.port}, metadata on {metadata_base}")
+        print(f"Point PUMP_FUN_STREAM_URL at it and set PUMP_FUN_STREAM=true")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,81 @@
+"""
+Data Models - Compact typed records shared by the scanner and the notifier
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+
+def _to_float(value: Any) -> float:
+    """Coerce API numbers (which may arrive as strings or None) to float"""
+    try:
+        return float(value) if value is not None and value != '' else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_int(value: Any) -> int:
+    """Coerce API timestamps to int"""
+    return int(_to_float(value))
+
+
+def _to_str(value: Any) -> str:
+    """Coerce optional API strings, treating None as empty"""
+    return str(value) if value is not None else ''
+
+
+@dataclass(frozen=True, slots=True)
+class Token:
+    """A standardized token listing from any source"""
+
+    address: str
+    name: str
+    symbol: str
+    chain: str = 'unknown'
+    market_cap: float = 0.0
+    price_usd: float = 0.0
+    liquidity_usd: float = 0.0
+    volume_24h: float = 0.0
+    price_change_24h: float = 0.0
+    created_timestamp: int = 0      # Seconds since epoch
+    pair_created_at: int = 0        # Milliseconds since epoch
+    website: str = ''
+    telegram: str = ''
+    twitter: str = ''
+    source: str = 'unknown'
+    is_pump_candidate: bool = False
+
+    @classmethod
+    def create(cls, **fields: Any) -> 'Token':
+        """Build a Token from raw source values; the single place types are normalized"""
+        return cls(
+            address=_to_str(fields.get('address')),
+            name=_to_str(fields.get('name')),
+            symbol=_to_str(fields.get('symbol')),
+            chain=_to_str(fields.get('chain')) or 'unknown',
+            market_cap=_to_float(fields.get('market_cap')),
+            price_usd=_to_float(fields.get('price_usd')),
+            liquidity_usd=_to_float(fields.get('liquidity_usd')),
+            volume_24h=_to_float(fields.get('volume_24h')),
+            price_change_24h=_to_float(fields.get('price_change_24h')),
+            created_timestamp=_to_int(fields.get('created_timestamp')),
+            pair_created_at=_to_int(fields.get('pair_created_at')),
+            website=_to_str(fields.get('website')),
+            telegram=_to_str(fields.get('telegram')),
+            twitter=_to_str(fields.get('twitter')),
+            source=_to_str(fields.get('source')) or 'unknown',
+            is_pump_candidate=bool(fields.get('is_pump_candidate', False)),
+        )
+
+    @property
+    def token_id(self) -> str:
+        """Dedup key used across the scanner and notifier"""
+        return f"{self.chain}:{self.address}"
+
+    @property
+    def has_socials(self) -> bool:
+        return bool(self.website or self.telegram or self.twitter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict view, for logging and JSON output"""
+        return asdict(self)
@@ -0,0 +1,157 @@
+"""
+Pump.fun Stream - Push-based ingestion of new launches over WebSocket
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import websockets
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class PumpFunStream:
+    """Subscribes to a new-token WebSocket feed and hands matured coins to on_coins.
+
+    Coins arrive seconds after launch, before they could pass min_age_seconds, so
+    each one waits in a heap ordered by the time it becomes old enough and is
+    released in creation order. After a reconnect, on_resume runs in the background
+    to backfill whatever launched while the socket was down.
+    """
+
+    def __init__(self, url: str, on_coins: Callable[[List[Dict]], None],
+                 on_resume: Optional[Callable[[], None]] = None, subscribe_message: Optional[Dict] = None):
+        self.url = url
+        self.on_coins = on_coins
+        self.on_resume = on_resume
+        self.subscribe_message = subscribe_message or {"method": CONFIG["pump_fun_stream_subscribe_method"]}
+        self._pending: List[Tuple[float, int, Dict]] = []
+        self._sequence = 0
+        self._stop_event: Optional[asyncio.Event] = None
+        self._resume_task: Optional[asyncio.Task] = None
+
+        self.connects = 0
+        self.events = 0
+        self.released = 0
+
+    async def run(self):
+        """Stay subscribed until stop(), reconnecting with jittered exponential backoff"""
+        self._stop_event = asyncio.Event()
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                async with websockets.connect(self.url, open_timeout=10) as ws:
+                    await ws.send(json.dumps(self.subscribe_message))
+                    logger.info(f"Subscribed to Pump.fun stream at {self.url}")
+                    attempt = 0
+                    self.connects += 1
+                    if self.connects > 1:
+                        self._resume()
+                    await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                logger.warning(f"Pump.fun stream disconnected: {e}")
+
+            if self._stop_event.is_set():
+                break
+            delay = self._backoff(attempt)
+            attempt += 1
+            logger.info(f"Reconnecting to Pump.fun stream in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+        if self._pending:
+            logger.info(f"Pump.fun stream stopped with {len(self._pending)} coins still maturing")
+
+    def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(CONFIG["pump_fun_stream_reconnect_max_seconds"],
+                    CONFIG["pump_fun_stream_reconnect_base_seconds"] * 2 ** attempt)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _resume(self):
+        """Backfill the disconnected window off the event loop, without pausing the stream"""
+        if self.on_resume is None:
+            return
+        if self._resume_task is not None and not self._resume_task.done():
+            return
+        logger.info("Pump.fun stream resumed, backfilling missed launches")
+        self._resume_task = asyncio.ensure_future(asyncio.to_thread(self.on_resume))
+
+    async def _consume(self, ws):
+        """Read events until the socket closes or stop(), releasing coins as they mature"""
+        stop_wait = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            while not self._stop_event.is_set():
+                receive = asyncio.ensure_future(ws.recv())
+                timeout = self._pending[0][0] - time.time() if self._pending else None
+                done, _ = await asyncio.wait({receive, stop_wait}, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if receive in done:
+                    self._queue_coins(receive.result())
+                else:
+                    receive.cancel()
+                await self._release()
+        finally:
+            stop_wait.cancel()
+
+    def _queue_coins(self, message: Any):
+        now = time.time()
+        for coin in self._extract_coins(message):
+            self.events += 1
+            # New-token events carry no creation time, but arrive within seconds of the
+            # create transaction, so arrival time stands in for it
+            created_timestamp = coin.get('created_timestamp') or int(now)
+            coin['created_timestamp'] = created_timestamp
+            ready_at = created_timestamp + CONFIG["min_age_seconds"] + 1
+            self._sequence += 1
+            heapq.heappush(self._pending, (ready_at, self._sequence, coin))
+
+    async def _release(self):
+        """Pass every coin that is now old enough to be evaluated to on_coins, oldest first"""
+        now = time.time()
+        batch = []
+        while self._pending and self._pending[0][0] <= now:
+            batch.append(heapq.heappop(self._pending)[2])
+        if not batch:
+            return
+        self.released += len(batch)
+        try:
+            await asyncio.to_thread(self.on_coins, batch)
+        except Exception as e:
+            logger.error(f"Error processing {len(batch)} streamed Pump.fun coins: {e}")
+
+    def _extract_coins(self, message: Any) -> List[Dict]:
+        """Coin dicts from one frame; subscription acks and other chatter yield nothing"""
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            logger.debug("Ignoring non-JSON Pump.fun stream frame")
+            return []
+
+        if isinstance(payload, dict):
+            payload = payload.get('data') or payload.get('coin') or payload
+        items = payload if isinstance(payload, list) else [payload]
+        # The SOL market cap and socials are completed by the scanner on ingest
+        return [item for item in items if isinstance(item, dict) and item.get('mint')]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'connects': self.connects,
+            'events': self.events,
+            'released': self.released,
+            'pending': len(self._pending),
+        }
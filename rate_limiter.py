@@ -0,0 +1,102 @@
+"""
+Rate Limiter - Token buckets per API host shared by the scanner and the notifier
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config import CONFIG, HOST_RATE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens/second up to `burst` tokens"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now, without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` could be taken"""
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = tokens - self._tokens
+            return max(0.0, missing / self.rate) if self.rate > 0 else float('inf')
+
+    def acquire(self, tokens: float = 1, max_wait: Optional[float] = None) -> Optional[float]:
+        """Take tokens, sleeping only while over budget. Returns seconds waited.
+
+        With max_wait, gives up without taking anything (and returns None) when the
+        budget would not be available within that many more seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            if max_wait is not None and waited + delay > max_wait:
+                return None
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by host (or any other budget key)"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = HOST_RATE_LIMITS if limits is None else limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: str, rate: float = None, burst: float = None) -> TokenBucket:
+        """Get or create the bucket for a key, using configured limits when present"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                limit = self.limits.get(key, {})
+                bucket = TokenBucket(
+                    rate=rate or limit.get('rate') or 1.0 / CONFIG["rate_limit_delay"],
+                    burst=burst or limit.get('burst') or CONFIG["rate_limit_burst"]
+                )
+                self._buckets[key] = bucket
+            return bucket
+
+    def acquire(self, key: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """Wait until the key has budget for one more request; None if that takes over max_wait"""
+        waited = self.bucket(key).acquire(max_wait=max_wait)
+        if waited:
+            logger.debug(f"Rate limited {key} for {waited:.2f}s")
+        return waited
+
+    def acquire_url(self, url: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """Wait until the URL's host has budget for one more request; None if that takes over max_wait"""
+        return self.acquire(urlparse(url).netloc, max_wait)
+
+
+# Process-wide limiter so every component draws from the same per-host budgets
+shared_rate_limiter = RateLimiter()
@@ -0,0 +1,187 @@
+"""
+Bot Runtime - Long-lived owner of the scanner and notifier for the whole process
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List
+
+from config import CONFIG
+from fetcher import Deadline
+from models import Token
+from pump_fun_stream import PumpFunStream
+from token_scanner import TokenScanner
+from telegram_bot import TelegramNotifier
+from subscriptions import SubscriptionIndex, load_profiles
+
+logger = logging.getLogger(__name__)
+
+
+class BotRuntime:
+    """Keeps one scanner and notifier alive across scans so sessions and caches stay warm"""
+
+    def __init__(self, telegram_token: str, chat_id: str):
+        self.scanner = TokenScanner()
+        self.notifier = TelegramNotifier(telegram_token, chat_id)
+        self.notifier.start()
+        self.subscriptions = SubscriptionIndex(load_profiles(CONFIG["subscriptions_path"], chat_id))
+        if CONFIG["subscriptions_path"]:
+            # Let through anything some subscriber wants; each chat's own rules are applied on fan-out
+            self.scanner.criteria_config = self.subscriptions.union_criteria()
+        if CONFIG["edit_in_place"]:
+            self.scanner.update_listener = self.notifier.note_token_update
+        # Alerts the outbox had to drop are offered again by the next scan
+        self.notifier.failure_listener = self.scanner.forget_seen
+        self.running = True
+        self.scan_count = 0
+        self.coalesced_runs = 0
+        self._scan_lock = threading.Lock()
+
+    def stop(self):
+        """Stop any in-progress notification loop"""
+        self.running = False
+
+    def close(self):
+        """Stop scanning and give queued alerts a chance to go out"""
+        self.stop()
+        self.notifier.close()
+
+    def scan(self) -> List[Token]:
+        """Scan all sources for new tokens"""
+        self.scan_count += 1
+        return self.scanner.scan_all_sources()
+
+    def notify(self, tokens: Iterable[Token]) -> int:
+        """Queue alerts for scanned tokens to every matching chat, returning how many tokens were queued.
+
+        Tokens are only marked seen once they get here, so those cut off by
+        max_tokens_per_scan or an early stop come back on the next scan.
+        """
+        queued_count = 0
+        for token in tokens:
+            if not self.running or queued_count >= CONFIG["max_tokens_per_scan"]:
+                break
+
+            try:
+                # The outbox workers deliver in the background, so scanning never waits on Telegram
+                queued = False
+                for chat_id in self.subscriptions.match(token):
+                    if self.notifier.queue_token_alert(token, chat_id):
+                        queued = True
+                if queued:
+                    queued_count += 1
+                self._mark_handled(token)
+            except Exception as e:
+                logger.error(f"Error processing token {token.address}: {e}")
+                continue
+
+        return queued_count
+
+    def notify_digest(self, tokens: Iterable[Token]) -> int:
+        """Buffer scanned tokens per chat and queue each chat's digest every digest_flush_size tokens"""
+        queued_count = 0
+        buffered: Dict[str, List[Token]] = {}
+        handled: List[Token] = []
+        token_count = 0
+        for token in tokens:
+            if not self.running or token_count >= CONFIG["max_tokens_per_scan"]:
+                break
+            chat_ids = self.subscriptions.match(token)
+            if chat_ids:
+                token_count += 1
+            handled.append(token)
+            for chat_id in chat_ids:
+                chat_buffer = buffered.setdefault(chat_id, [])
+                chat_buffer.append(token)
+                if len(chat_buffer) >= CONFIG["digest_flush_size"]:
+                    queued_count += self.notifier.queue_token_digest(chat_buffer, chat_id=chat_id)
+                    buffered[chat_id] = []
+
+        # Whatever is left when the scan ends goes out as a final, smaller digest per chat
+        for chat_id, chat_buffer in buffered.items():
+            if chat_buffer:
+                queued_count += self.notifier.queue_token_digest(chat_buffer, chat_id=chat_id)
+        for token in handled:
+            self._mark_handled(token)
+        return queued_count
+
+    def _mark_handled(self, token: Token):
+        """Mark a token seen once every chat has it; until then later scans offer it again.
+
+        A token can pass the union pre-filter while missing some chats' rules, and
+        grow into them later. Per-chat dedup in the notifier keeps the chats that
+        already have it from being alerted twice, and their alerts are still updated.
+        """
+        if all(self.notifier.has_sent(token, chat_id) for chat_id in self.subscriptions.chat_ids):
+            self.scanner.mark_seen(token)
+        elif CONFIG["edit_in_place"]:
+            # Seen tokens reach the notifier through update_listener; these don't, so do it here
+            self.notifier.note_token_update(token)
+
+    def _notify_any(self, tokens: Iterable[Token]) -> int:
+        """Queue tokens as digests or single alerts, whichever mode is configured"""
+        if CONFIG["digest_mode"]:
+            return self.notify_digest(tokens)
+        return self.notify(tokens)
+
+    def create_stream(self) -> PumpFunStream:
+        """WebSocket ingestion source that feeds the same filter and notify path as scans"""
+        return PumpFunStream(
+            CONFIG["pump_fun_stream_url"],
+            on_coins=self.ingest_stream_coins,
+            on_resume=self.backfill_stream_gap
+        )
+
+    def ingest_stream_coins(self, coins: List[Dict]):
+        """Filter and alert on coins pushed by the stream"""
+        if not self.running:
+            return
+        tokens = self.scanner.ingest_pump_fun_coins(coins)
+        try:
+            queued_count = self._notify_any(tokens)
+        finally:
+            tokens.close()
+        if queued_count:
+            logger.info(f"Queued {queued_count} notifications from the Pump.fun stream")
+
+    def backfill_stream_gap(self):
+        """After a reconnect, alert on launches the stream missed while it was down"""
+        if not self.running:
+            return
+        tokens = self.scanner.backfill_pump_fun()
+        try:
+            queued_count = self._notify_any(tokens)
+        finally:
+            tokens.close()
+        logger.info(f"Backfill after stream reconnect queued {queued_count} notifications")
+
+    def scan_and_notify(self):
+        """Run one scan, alerting on each token as soon as its source responds.
+
+        A call that arrives while a scan is still running is dropped rather than
+        queued, and every scan is cut off at scan_deadline_seconds.
+        """
+        if not self.running:
+            return
+
+        if not self._scan_lock.acquire(blocking=False):
+            self.coalesced_runs += 1
+            logger.warning(f"Previous scan still running, skipping this one ({self.coalesced_runs} skipped so far)")
+            return
+
+        try:
+            self.scan_count += 1
+            logger.info(f"Starting token scan #{self.scan_count}...")
+
+            # The notify stage consumes the scanner pipeline directly
+            stream = self.scanner.stream_all_sources(Deadline(CONFIG["scan_deadline_seconds"]))
+            try:
+                queued_count = self._notify_any(stream)
+            finally:
+                stream.close()
+            logger.info(f"Queued {queued_count} notifications, outbox: {self.notifier.outbox.stats()}")
+
+        except Exception as e:
+            logger.error(f"Error in scan_and_notify: {e}")
+        finally:
+            self._scan_lock.release()
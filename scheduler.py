@@ -0,0 +1,78 @@
+"""
+Scheduler - Runs a blocking job at fixed, drift-free intervals on an asyncio loop
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalScheduler:
+    """Fires a job every interval_seconds, aligned to the time the scheduler started.
+
+    Tick n is due at start + n * interval on the loop's monotonic clock, so a slow
+    run or a late wakeup never pushes later ticks back. The job runs in a worker
+    thread, leaving the loop (and the outbox threads) free while a scan is in
+    progress. Between ticks the loop sleeps on a single timer instead of polling.
+    """
+
+    def __init__(self, job: Callable[[], None], interval_seconds: float, run_immediately: bool = True):
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.run_immediately = run_immediately
+        self.runs = 0
+        self.skipped_ticks = 0
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def run(self):
+        """Run ticks until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        start = self._loop.time()
+        tick = 0 if self.run_immediately else 1
+
+        while not self._stop_event.is_set():
+            due = start + tick * self.interval_seconds
+            if await self._sleep_until(due):
+                break
+
+            await self._run_job()
+
+            # If the job overran one or more ticks, skip them rather than firing back to back
+            next_tick = tick + 1
+            elapsed_ticks = int((self._loop.time() - start) // self.interval_seconds) + 1
+            if elapsed_ticks > next_tick:
+                skipped = elapsed_ticks - next_tick
+                self.skipped_ticks += skipped
+                logger.warning(f"Scan overran its interval, skipping {skipped} tick(s)")
+                next_tick = elapsed_ticks
+            tick = next_tick
+
+    async def _sleep_until(self, due: float) -> bool:
+        """Sleep until the loop clock reaches due; True if stop() was called meanwhile"""
+        delay = due - self._loop.time()
+        if delay <= 0:
+            return self._stop_event.is_set()
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _run_job(self):
+        self.runs += 1
+        try:
+            await asyncio.to_thread(self.job)
+        except Exception as e:
+            logger.error(f"Error in scheduled job: {e}")
+
+    def stop(self):
+        """Stop after the current run; safe to call from signal handlers and other threads"""
+        if self._loop is None or self._stop_event is None:
+            return
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._stop_event.set)
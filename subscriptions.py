@@ -0,0 +1,173 @@
+"""
+Subscriptions - Per-chat filter profiles matched against every token in one indexed pass
+"""
+
+import json
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import CONFIG
+from filter_engine import CriteriaThresholds
+from models import Token
+
+logger = logging.getLogger(__name__)
+
+# Profile keys that override the matching global CONFIG criteria
+PROFILE_CRITERIA = ("min_market_cap", "max_market_cap", "min_age_seconds", "max_age_seconds", "min_liquidity")
+
+
+@dataclass(frozen=True)
+class SubscriberProfile:
+    """One chat and the rules a token must meet to be alerted there"""
+
+    chat_id: str
+    min_market_cap: float
+    max_market_cap: float
+    min_age_seconds: float
+    max_age_seconds: float
+    min_liquidity: float
+    chains: Tuple[str, ...] = ()     # Empty means every chain
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SubscriberProfile':
+        """Build a profile from a subscriptions file entry; missing rules fall back to CONFIG"""
+        return cls(
+            chat_id=str(data["chat_id"]),
+            chains=tuple(data.get("chains") or ()),
+            **{key: data.get(key, CONFIG[key]) for key in PROFILE_CRITERIA}
+        )
+
+    def criteria(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in PROFILE_CRITERIA}
+
+
+class RangeIndex:
+    """Closed ranges [low, high] answering "which ranges contain v" as a bitmask in O(log n).
+
+    A value is inside a range when low <= v and v <= high. Sorting the lows with a
+    running OR of their bits gives every range with low <= v from one bisect, and the
+    highs with a running OR from the end gives every range with high >= v; the answer
+    is the AND of the two.
+    """
+
+    def __init__(self, ranges: Sequence[Tuple[float, float, int]]):
+        by_low = sorted((low, bit) for low, _, bit in ranges)
+        by_high = sorted((high, bit) for _, high, bit in ranges)
+
+        self._lows = [low for low, _ in by_low]
+        self._low_masks = [0]
+        for _, bit in by_low:
+            self._low_masks.append(self._low_masks[-1] | bit)
+
+        self._highs = [high for high, _ in by_high]
+        self._high_masks = [0]
+        for _, bit in reversed(by_high):
+            self._high_masks.append(self._high_masks[-1] | bit)
+        self._high_masks.reverse()
+
+    def match(self, value: float) -> int:
+        return self._low_masks[bisect_right(self._lows, value)] & self._high_masks[bisect_left(self._highs, value)]
+
+
+class CriteriaIndex:
+    """Market cap, age and liquidity range indexes for one set of thresholds per profile"""
+
+    def __init__(self, thresholds: Sequence[Tuple[float, float, float, float, float]]):
+        inf = float("inf")
+        self.all_mask = (1 << len(thresholds)) - 1
+        self.market_cap = RangeIndex([(t[0], t[1], 1 << i) for i, t in enumerate(thresholds)])
+        self.age = RangeIndex([(t[2], t[3], 1 << i) for i, t in enumerate(thresholds)])
+        self.liquidity = RangeIndex([(t[4], inf, 1 << i) for i, t in enumerate(thresholds)])
+
+    def match(self, token: Token, now: float) -> int:
+        # Zero market cap, liquidity or creation time means "unknown" and is not filtered on
+        mask = self.all_mask
+        if token.market_cap > 0:
+            mask &= self.market_cap.match(token.market_cap)
+        if mask and token.created_timestamp:
+            mask &= self.age.match(now - token.created_timestamp)
+        if mask and token.liquidity_usd > 0:
+            mask &= self.liquidity.match(token.liquidity_usd)
+        return mask
+
+
+class SubscriptionIndex:
+    """Matches tokens against all subscriber profiles at once.
+
+    Each profile owns one bit. Every rule dimension is indexed separately and
+    returns the bitmask of profiles it admits, so matching a token costs a few
+    bisects plus one AND per dimension rather than a loop over subscribers.
+    """
+
+    def __init__(self, profiles: Sequence[SubscriberProfile]):
+        self.profiles = list(profiles)
+        self.chat_ids = [profile.chat_id for profile in self.profiles]
+        thresholds = [CriteriaThresholds({**CONFIG, **profile.criteria()}) for profile in self.profiles]
+
+        self._regular = CriteriaIndex([
+            (t.min_cap, t.max_cap, t.min_age, t.max_age, t.min_liquidity) for t in thresholds
+        ])
+        # Pump.fun candidates get the same relaxed bounds the global filter gives them
+        self._pump = CriteriaIndex([
+            (t.pump_min_cap, t.pump_max_cap, t.min_age, t.pump_max_age, t.pump_min_liquidity) for t in thresholds
+        ])
+
+        self._any_chain_mask = 0
+        self._chain_masks: Dict[str, int] = {}
+        for i, profile in enumerate(self.profiles):
+            if not profile.chains:
+                self._any_chain_mask |= 1 << i
+            for chain in profile.chains:
+                self._chain_masks[chain] = self._chain_masks.get(chain, 0) | 1 << i
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def match_mask(self, token: Token, now: Optional[float] = None) -> int:
+        """Bitmask of the profiles a token satisfies"""
+        if not (token.address and token.name and token.symbol):
+            return 0
+        mask = self._any_chain_mask | self._chain_masks.get(token.chain, 0)
+        if not mask:
+            return 0
+        index = self._pump if token.is_pump_candidate else self._regular
+        return mask & index.match(token, time.time() if now is None else now)
+
+    def match(self, token: Token, now: Optional[float] = None) -> List[str]:
+        """Chat ids whose profiles the token satisfies"""
+        mask = self.match_mask(token, now)
+        chat_ids = []
+        while mask:
+            low_bit = mask & -mask
+            chat_ids.append(self.profiles[low_bit.bit_length() - 1].chat_id)
+            mask ^= low_bit
+        return chat_ids
+
+    def union_criteria(self) -> Dict[str, Any]:
+        """Loosest bounds across all profiles, for the scanner's pre-filter"""
+        criteria = dict(CONFIG)
+        if self.profiles:
+            criteria.update(
+                min_market_cap=min(p.min_market_cap for p in self.profiles),
+                max_market_cap=max(p.max_market_cap for p in self.profiles),
+                min_age_seconds=min(p.min_age_seconds for p in self.profiles),
+                max_age_seconds=max(p.max_age_seconds for p in self.profiles),
+                min_liquidity=min(p.min_liquidity for p in self.profiles),
+            )
+        return criteria
+
+
+def load_profiles(path: str, default_chat_id: str) -> List[SubscriberProfile]:
+    """Profiles from a JSON list at path, or a single global-CONFIG profile for default_chat_id"""
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                profiles = [SubscriberProfile.from_dict(entry) for entry in json.load(f)]
+            logger.info(f"Loaded {len(profiles)} subscriber profiles from {path}")
+            return profiles
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error loading subscriptions from {path}: {e}")
+    return [SubscriberProfile.from_dict({"chat_id": default_chat_id})]
@@ -3,17 +3,38 @@ Telegram Bot - Handles sending notifications to Telegram channels
 """
 
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set
+from typing import Callable, Dict, Iterable, Optional, Set
+from dataclasses import dataclass
 import requests
 import json
+from requests.adapters import HTTPAdapter
 
-from config import CONFIG, CHAIN_CONFIGS
+from config import CONFIG
+from rate_limiter import shared_rate_limiter
+from cache import TTLCache, MISSING
+from models import Token
+from dedup_store import create_dedup_set, get_default_database
+from telegram_outbox import OutboxMessage, SendResult, TelegramOutbox
+from digest import pack_digests
+from message_renderer import default_renderer
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class AlertRecord:
+    """The Telegram message an alert went out as, and the figures it currently shows"""
+
+    message_id: int
+    market_cap: float
+    liquidity_usd: float
+    volume_24h: float
+    edit_queued_at: float = 0.0
+
+
 class TelegramNotifier:
     """Handles Telegram notifications for new tokens"""
 
@@ -21,146 +42,288 @@ class TelegramNotifier:
         self.token = token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}"
-        self.sent_tokens: Set[str] = set()
-        self.last_cleanup = datetime.now()
+        self.sent_tokens = create_dedup_set("sent", CONFIG["duplicate_check_hours"] * 3600)
+        # Scans, stream ingest and backfill notify from different threads
+        self._sent_lock = threading.Lock()
+        self.history = get_default_database()
+        self.rate_limiter = shared_rate_limiter
+        self.renderer = default_renderer
+        self.session = self._create_session()
+        self.timeout = (CONFIG["telegram_connect_timeout"], CONFIG["telegram_read_timeout"])
+        # Editable alerts by token_id, as {chat_id: AlertRecord}; {} caches "none"
+        self.alerts = TTLCache(
+            maxsize=CONFIG["alert_tracking_size"],
+            ttl_seconds=CONFIG["alert_edit_window_hours"] * 3600
+        )
+        self.outbox = TelegramOutbox(
+            deliver=self._deliver_outbox_message,
+            global_bucket=self.rate_limiter.bucket('api.telegram.org'),
+            chat_bucket=self._chat_bucket,
+            on_failed=self._on_outbox_failure
+        )
+        # Called with tokens whose alert could not be delivered, so the scanner can offer them again
+        self.failure_listener: Optional[Callable[[Token], None]] = None
+
+    def _create_session(self) -> requests.Session:
+        """Keep-alive session sized so every outbox worker can hold its own connection"""
+        session = requests.Session()
+        pool_size = max(CONFIG["telegram_pool_size"], CONFIG["telegram_outbox_workers"])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        return session
+
+    def _chat_bucket(self, chat_id: str):
+        """Per-chat send budget, shared by direct sends and the outbox"""
+        return self.rate_limiter.bucket(
+            f"api.telegram.org:chat:{chat_id}",
+            rate=CONFIG["telegram_chat_rate"],
+            burst=CONFIG["telegram_chat_burst"]
+        )
+
+    def _wait_for_send_budget(self, chat_id: str):
+        """Block only while the global bot budget or the chat's budget is exhausted"""
+        self.rate_limiter.acquire('api.telegram.org')
+        self._chat_bucket(chat_id).acquire()
+
+    def start(self):
+        """Start the background outbox workers"""
+        self.outbox.start()
+
+    def close(self, drain_timeout: float = 10.0):
+        """Flush what the outbox can within drain_timeout, stop its workers and release connections"""
+        self.outbox.stop(drain_timeout)
+        self.session.close()
 
     def cleanup_sent_tokens(self):
-        """Clean up old entries from sent_tokens set"""
-        if (datetime.now() - self.last_cleanup
-            ).total_seconds() > CONFIG["duplicate_check_hours"] * 3600:
-            self.sent_tokens.clear()
-            self.last_cleanup = datetime.now()
-            logger.info("Cleaned up sent tokens cache")
-
-    def should_notify(self, token: Dict) -> bool:
-        """Check if we should send a notification for this token"""
-        self.cleanup_sent_tokens()
+        """Drop sent_tokens entries older than duplicate_check_hours"""
+        expired = self.sent_tokens.expire()
+        if expired:
+            logger.info(f"Expired {expired} sent tokens, {len(self.sent_tokens)} still tracked")
 
-        token_id = f"{token.get('chain', '')}:{token.get('address', '')}"
+    def should_notify(self, token: Token, chat_id: Optional[str] = None) -> bool:
+        """Check if we should send a notification for this token to a chat"""
+        self.cleanup_sent_tokens()
 
-        # Check if already sent
-        if token_id in self.sent_tokens:
-            return False
+        sent_key = self._sent_key(token.token_id, chat_id or self.chat_id)
 
-        # Add to sent tokens to prevent duplicates
-        self.sent_tokens.add(token_id)
+        # Check and add as one step, or two threads offering the same token could both pass
+        with self._sent_lock:
+            if sent_key in self.sent_tokens:
+                return False
+            self.sent_tokens.add(sent_key)
         return True
 
-    def send_token_alert(self, token: Dict) -> bool:
+    def has_sent(self, token: Token, chat_id: Optional[str] = None) -> bool:
+        """Whether the token was alerted to the chat within duplicate_check_hours"""
+        return self._sent_key(token.token_id, chat_id or self.chat_id) in self.sent_tokens
+
+    def _forget_sent(self, token: Token, chat_id: Optional[str] = None):
+        """Undo should_notify for an alert that never went out, so a later scan can retry it"""
+        self.sent_tokens.discard(self._sent_key(token.token_id, chat_id or self.chat_id))
+        if self.failure_listener is not None:
+            try:
+                self.failure_listener(token)
+            except Exception as e:
+                logger.error(f"Error in failure listener for {token.token_id}: {e}")
+
+    def _on_outbox_failure(self, message: OutboxMessage, permanent: bool = False):
+        """An outbox message was dropped for good; unless Telegram rejected it outright, retry its tokens later"""
+        if message.edit_message_id is not None:
+            return  # The original alert still stands
+        tokens = ([message.token] if message.token is not None else []) + message.digest_tokens
+        if permanent:
+            # The same text would be rejected again on every scan, so keep them deduplicated
+            logger.error(f"Telegram rejected a message for chat {message.chat_id}, "
+                         f"not retrying its {len(tokens)} tokens")
+            return
+        for token in tokens:
+            self._forget_sent(token, message.chat_id)
+
+    def _sent_key(self, token_id: str, chat_id: str) -> str:
+        """Per-chat dedup key; the main chat keeps bare token ids so existing dedup state stays valid"""
+        return token_id if chat_id == self.chat_id else f"{chat_id}|{token_id}"
+
+    def send_token_alert(self, token: Token) -> bool:
         """Send a token alert to Telegram, checking for duplicate tokens"""
         try:
             if not self.should_notify(token):
                 return False  # Skip sending if we've already sent this token
             message = self._format_token_message(token)
-            return self._send_message(message, parse_mode='Markdown')
+            self._wait_for_send_budget(self.chat_id)
+            result = self._post_message(self.chat_id, message, parse_mode='Markdown')
+            if result.ok:
+                self._record_alert(token)
+            elif not result.permanent:
+                self._forget_sent(token)
+            return result.ok
 
         except Exception as e:
             logger.error(f"Error sending token alert: {e}")
             return False
 
-    def _format_token_message(self, token: Dict) -> str:
-        """Format token data into a Telegram message"""
+    def queue_token_alert(self, token: Token, chat_id: Optional[str] = None) -> bool:
+        """Queue a token alert for the outbox workers; returns without waiting on Telegram"""
+        chat_id = chat_id or self.chat_id
         try:
-            name = token['name']
-            symbol = token['symbol']
-            address = token['address']
-            chain = token.get('chain', 'unknown')
-
-            # Market data
-            price = float(token.get('price_usd', 0))
-            market_cap = token.get('market_cap', 0)
-            liquidity = token.get('liquidity_usd', 0)
-            volume_24h = token.get('volume_24h', 0)
-            price_change = token.get('price_change_24h', 0)
-
-            # Chain info
-            chain_config = CHAIN_CONFIGS.get(chain, {})
-            chain_name = chain_config.get('name', f'⛓️ {chain.title()}')
-
-            # Calculate exact age
-            created_timestamp = token.get('created_timestamp', 0)
-            if created_timestamp:
-                created_time = datetime.fromtimestamp(created_timestamp)
-                age_seconds = (datetime.now() - created_time).total_seconds()
-                days = int(age_seconds // 86400)
-                hours = int((age_seconds % 86400) // 3600)
-                minutes = int((age_seconds % 3600) // 60)
-                seconds_remaining = int(age_seconds % 60)
-                age_display = f"{days}d {hours}h {minutes}m" if days else f"{hours}h {minutes}m {seconds_remaining}s" if hours else f"{minutes}m {seconds_remaining}s"
-            else:
-                age_display = "Unknown"
-
-            # Format numbers
-            def format_number(num):
-                if num >= 1e6:
-                    return f"${num/1e6:.2f}M"
-                elif num >= 1e3:
-                    return f"${num/1e3:.1f}K"
-                else:
-                    return f"${num:.2f}"
-
-            # Price change emoji
-            change_emoji = ("🚀" if price_change > 5 else
-                            "🟢" if price_change > 0 else "💥" if price_change <
-                            -10 else "🔴" if price_change < 0 else "🟡")
-
-            # Short address for display
-            short_address = f"{address[:6]}...{address[-4:]}"
-
-            # Build message
-            message = f"""🚀 **NEW TOKEN: {name} (${symbol})**
-
-    **Chain:** {chain_name} 
-    **Age:** {age_display} 
-    **Contract:** `{short_address}`
-
-    **Price:** ${price:.8f} {change_emoji} {price_change:.2f}%
-    **Market Cap:** {format_number(market_cap)} 💰
-    **Liquidity:** {format_number(liquidity)} 💧
-    **Volume 24h:** {format_number(volume_24h)} 📊
-
-    **Links:**"""
-
-            # Use a set to avoid duplicate links
-            links = set()
-            if token.get('website'):
-                links.add(f"[Website]({token['website']}) 🌐")
-            if token.get('telegram'):
-                links.add(f"[Telegram]({token['telegram']}) 📱")
-            if token.get('twitter'):
-                links.add(f"[Twitter]({token['twitter']}) 🐦")
-
-            # Add chain-specific links
-            if chain_config:
-                chart_url = f"{chain_config.get('chart_url', '')}{address}"
-                links.add(f"[Chart]({chart_url}) 📈")
-
-                if chain_config.get('dex_url'):
-                    trade_url = f"{chain_config['dex_url']}{address}"
-                    dex_name = self._get_dex_name(chain)
-                    links.add(f"[Trade]({trade_url}) 💹")
-
-                if chain_config.get('explorer_url'):
-                    explorer_url = f"{chain_config['explorer_url']}{address}"
-                    links.add(f"[Explorer]({explorer_url}) 🔍")
+            if not self.should_notify(token, chat_id):
+                return False  # Skip if we've already sent this token
+            record = self._alert_records(token.token_id).get(chat_id)
+            if CONFIG["edit_in_place"] and record is not None:
+                # Still editable, so refresh the earlier alert rather than posting it again
+                self._queue_edit(token, chat_id, record)
+                return False
+            message = OutboxMessage(
+                chat_id=chat_id,
+                text=self._format_token_message(token),
+                parse_mode='Markdown',
+                token=token
+            )
+            if not self.outbox.enqueue(message):
+                self._forget_sent(token, chat_id)
+                return False
+            return True
 
-            # Join all links with separators, ensuring no duplicates
-            if links:
-                message += f"\n{' | '.join(links)}"
+        except Exception as e:
+            logger.error(f"Error queueing token alert: {e}")
+            return False
 
-            # Source and warnings
-            source = token.get('source', 'unknown')
-            footer = f"Source: {source.title()}"
-            if market_cap < 50000:  # Under $50k market cap
-                footer += " | ⚠️ **HIGH RISK - Do Your Own Research!**"
+    def queue_token_digest(self, tokens: Iterable[Token], group_by: str = None,
+                           chat_id: Optional[str] = None) -> int:
+        """Queue new tokens as packed digest messages, returning how many tokens were queued"""
+        chat_id = chat_id or self.chat_id
+        try:
+            fresh = [token for token in tokens if self.should_notify(token, chat_id)]
+            queued = 0
+            for text, covered in pack_digests(fresh, group_by):
+                message = OutboxMessage(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode='Markdown',
+                    digest_tokens=covered
+                )
+                if self.outbox.enqueue(message):
+                    queued += len(covered)
+                else:
+                    for token in covered:
+                        self._forget_sent(token, chat_id)
+            return queued
 
-            message += f"\n\n{footer}"
+        except Exception as e:
+            logger.error(f"Error queueing token digest: {e}")
+            return 0
 
-            return message
+    def note_token_update(self, token: Token):
+        """Queue edits of a token's earlier alerts if its figures moved enough to matter"""
+        try:
+            for chat_id, record in self._alert_records(token.token_id).items():
+                self._queue_edit(token, chat_id, record)
+        except Exception as e:
+            logger.error(f"Error queueing alert update for {token.token_id}: {e}")
+
+    def _queue_edit(self, token: Token, chat_id: str, record: AlertRecord):
+        """Queue one editMessageText, at most every edit_min_interval_seconds per alert"""
+        if not self._has_meaningful_change(record, token):
+            return
+
+        now = time.monotonic()
+        if now - record.edit_queued_at < CONFIG["edit_min_interval_seconds"]:
+            return
+        record.edit_queued_at = now
+
+        text = self._format_token_message(token)
+        text += f"\n\n🔄 _Updated {datetime.now().strftime('%H:%M:%S')}_"
+        self.outbox.enqueue(OutboxMessage(
+            chat_id=chat_id,
+            text=text,
+            parse_mode='Markdown',
+            token=token,
+            edit_message_id=record.message_id
+        ))
+
+    def _alert_records(self, token_id: str) -> Dict[str, AlertRecord]:
+        """Editable alerts for a token by chat, from memory or else the persistent history"""
+        records = self.alerts.get(token_id)
+        if records is not MISSING:
+            return records
+
+        records = {}
+        if self.history is not None:
+            try:
+                since = time.time() - CONFIG["alert_edit_window_hours"] * 3600
+                for chat_id, message_id, market_cap, liquidity, volume in self.history.get_alerts(token_id, since):
+                    records[chat_id] = AlertRecord(message_id, market_cap or 0.0, liquidity or 0.0, volume or 0.0)
+            except Exception as e:
+                logger.error(f"Error reading alert history for {token_id}: {e}")
+        self.alerts.set(token_id, records)
+        return records
+
+    def _has_meaningful_change(self, record: AlertRecord, token: Token) -> bool:
+        """True when market cap, liquidity or volume moved by at least edit_min_change_pct"""
+        threshold = CONFIG["edit_min_change_pct"] / 100
+        for shown, current in ((record.market_cap, token.market_cap),
+                               (record.liquidity_usd, token.liquidity_usd),
+                               (record.volume_24h, token.volume_24h)):
+            if shown <= 0:
+                if current > 0:
+                    return True
+                continue
+            if abs(current - shown) / shown >= threshold:
+                return True
+        return False
+
+    def _deliver_outbox_message(self, message: OutboxMessage) -> SendResult:
+        """Send one outbox message; the outbox has already reserved its rate budget"""
+        if message.edit_message_id is not None:
+            result = self._edit_message(message.chat_id, message.edit_message_id, message.text, message.parse_mode)
+            if result.ok and message.token is not None:
+                self._record_edit(message.token, message.chat_id)
+            return result
+
+        result = self._post_message(message.chat_id, message.text, message.parse_mode)
+        if result.ok:
+            if message.token is not None:
+                self._record_alert(message.token, message.chat_id, result.message_id)
+            for token in message.digest_tokens:
+                # A digest covers many tokens, so its entries are not edited individually
+                self._record_alert(token, message.chat_id)
+        return result
+
+    def _record_alert(self, token: Token, chat_id: Optional[str] = None, message_id: Optional[int] = None):
+        """Remember a sent alert in memory and in the persistent history, if enabled"""
+        chat_id = chat_id or self.chat_id
+        if message_id is not None:
+            self._alert_records(token.token_id)[chat_id] = AlertRecord(
+                message_id, token.market_cap, token.liquidity_usd, token.volume_24h
+            )
+        if self.history is None:
+            return
+        try:
+            self.history.record_alert(chat_id, token.token_id, message_id,
+                                      token.market_cap, token.liquidity_usd, token.volume_24h)
+        except Exception as e:
+            logger.error(f"Error recording alert history for {token.token_id}: {e}")
+
+    def _record_edit(self, token: Token, chat_id: str):
+        """Make the figures an edit just showed the baseline for the next one"""
+        record = self._alert_records(token.token_id).get(chat_id)
+        if record is not None:
+            record.market_cap, record.liquidity_usd, record.volume_24h = (
+                token.market_cap, token.liquidity_usd, token.volume_24h)
+        if self.history is None:
+            return
+        try:
+            self.history.update_alert_figures(chat_id, token.token_id, token.market_cap,
+                                              token.liquidity_usd, token.volume_24h)
+        except Exception as e:
+            logger.error(f"Error updating alert history for {token.token_id}: {e}")
 
+    def _format_token_message(self, token: Token) -> str:
+        """Format token data into a Telegram message"""
+        try:
+            return self.renderer.render_alert(token)
         except Exception as e:
             logger.error(f"Error formatting token message: {e}")
-            return f"Error formatting message for token {token.get('address', 'unknown')}"
+            return f"Error formatting message for token {token.address or 'unknown'}"
 
     def _get_dex_name(self, chain: str) -> str:
         """Get the primary DEX name for a chain"""
@@ -176,37 +339,80 @@ class TelegramNotifier:
 
     def _send_message(self, text: str, parse_mode: str = 'Markdown') -> bool:
         """Send a message to Telegram"""
-        try:
-            url = f"{self.base_url}/sendMessage"
-
-            payload = {
-                'chat_id': self.chat_id,
-                'text': text,
-                'parse_mode': parse_mode,
-                'disable_web_page_preview': False
-            }
+        self._wait_for_send_budget(self.chat_id)
+        return self._post_message(self.chat_id, text, parse_mode).ok
+
+    def _post_message(self, chat_id: str, text: str, parse_mode: str = 'Markdown') -> SendResult:
+        """Call sendMessage once, without any rate limiting of its own"""
+        payload = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': False
+        }
+        return self._call_api('sendMessage', chat_id, payload)
+
+    def _edit_message(self, chat_id: str, message_id: int, text: str, parse_mode: str = 'Markdown') -> SendResult:
+        """Call editMessageText once to replace the text of an earlier alert"""
+        payload = {
+            'chat_id': chat_id,
+            'message_id': message_id,
+            'text': text,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': False
+        }
+        return self._call_api('editMessageText', chat_id, payload)
 
-            response = requests.post(url, json=payload, timeout=30)
+    def _call_api(self, method: str, chat_id: str, payload: Dict) -> SendResult:
+        """POST one Bot API method and turn the response into a SendResult"""
+        try:
+            url = f"{self.base_url}/{method}"
+            response = self.session.post(url, json=payload, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
                 if result.get('ok'):
-                    logger.info("Message sent successfully to Telegram")
-                    return True
+                    logger.info(f"Telegram {method} succeeded")
+                    message = result.get('result')
+                    message_id = message.get('message_id') if isinstance(message, dict) else None
+                    return SendResult(ok=True, message_id=message_id)
                 else:
                     logger.error(
                         f"Telegram API error: {result.get('description', 'Unknown error')}"
                     )
-                    return False
+                    return SendResult(ok=False)
+            elif response.status_code == 429:
+                retry_after = self._parse_retry_after(response)
+                logger.warning(
+                    f"Telegram rate limit hit for chat {chat_id}, retry after {retry_after}s"
+                )
+                return SendResult(ok=False, retry_after=retry_after)
+            elif response.status_code == 400 and 'message is not modified' in response.text:
+                # The edit would not change anything, which is as good as done
+                return SendResult(ok=True)
             else:
                 logger.error(
-                    f"HTTP error {response.status_code} when sending to Telegram"
+                    f"HTTP error {response.status_code} when calling Telegram {method}: {response.text}"
                 )
-                return False
+                # Other 4xx answers reject the request itself; only server errors are worth retrying
+                return SendResult(ok=False, permanent=400 <= response.status_code < 500)
 
         except Exception as e:
-            logger.error(f"Error sending message to Telegram: {e}")
-            return False
+            logger.error(f"Error calling Telegram {method}: {e}")
+            return SendResult(ok=False)
+
+    def _parse_retry_after(self, response) -> float:
+        """Read parameters.retry_after from a 429 response, falling back to the Retry-After header"""
+        try:
+            retry_after = response.json().get('parameters', {}).get('retry_after')
+            if retry_after is not None:
+                return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return float(response.headers.get('Retry-After', CONFIG["telegram_default_retry_after"]))
+        except (TypeError, ValueError):
+            return float(CONFIG["telegram_default_retry_after"])
 
     def send_status_message(self, message: str) -> bool:
         """Send a status/info message to Telegram"""
@@ -221,7 +427,8 @@ class TelegramNotifier:
         """Test the Telegram bot connection"""
         try:
             url = f"{self.base_url}/getMe"
-            response = requests.get(url, timeout=10)
+            self.rate_limiter.acquire('api.telegram.org')
+            response = self.session.get(url, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
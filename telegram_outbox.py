@@ -0,0 +1,275 @@
+"""
+Telegram Outbox - Queues alerts and drains them with rate-limit-aware background workers
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from config import CONFIG
+from models import Token
+from rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxMessage:
+    """A message waiting to be delivered to one chat"""
+
+    chat_id: str
+    text: str
+    parse_mode: str = 'Markdown'
+    token: Optional[Token] = None
+    digest_tokens: List[Token] = field(default_factory=list)
+    edit_message_id: Optional[int] = None    # Set for editMessageText updates of an earlier alert
+    enqueued_at: float = 0.0
+    attempts: int = 0
+
+
+@dataclass
+class SendResult:
+    """Outcome of one Telegram API call; retry_after is set when Telegram answered 429.
+
+    permanent marks a rejection of the message itself (e.g. 400 can't parse
+    entities), which sending the same text again cannot fix.
+    """
+
+    ok: bool
+    retry_after: Optional[float] = None
+    message_id: Optional[int] = None
+    permanent: bool = False
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class TelegramOutbox:
+    """Per-chat FIFO queues drained by worker threads.
+
+    A worker only takes a message once both the chat's bucket and the global bot
+    bucket have budget, so a throttled chat never holds up the others. At most one
+    message per chat is in flight, which keeps each chat's alerts in order. When
+    Telegram answers 429, the message goes back to the head of its chat queue and
+    that chat alone is held until retry_after has passed.
+
+    A message that is dropped for good (a delivery failure, too many 429s, or still
+    queued at shutdown) is passed to on_failed along with whether the failure was
+    permanent, so the sender can undo its dedup when a retry could still succeed.
+
+    Edits of earlier alerts wait in a separate per-chat queue that is only drained
+    when the chat has no new alerts pending, and a second edit of the same message
+    replaces the queued one instead of adding another API call.
+    """
+
+    def __init__(self, deliver: Callable[[OutboxMessage], SendResult], global_bucket: TokenBucket,
+                 chat_bucket: Callable[[str], TokenBucket], workers: int = None, max_size: int = None,
+                 on_failed: Optional[Callable[[OutboxMessage, bool], None]] = None):
+        self.deliver = deliver
+        self.on_failed = on_failed
+        self.global_bucket = global_bucket
+        self.chat_bucket = chat_bucket
+        self.num_workers = workers or CONFIG["telegram_outbox_workers"]
+        self.max_size = max_size or CONFIG["telegram_outbox_size"]
+
+        self._queues: Dict[str, Deque[OutboxMessage]] = {}
+        self._edit_queues: Dict[str, Deque[OutboxMessage]] = {}
+        self._queued_edits: Dict[Tuple[str, int], OutboxMessage] = {}
+        self._in_flight: Set[str] = set()
+        self._held_until: Dict[str, float] = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.edits_coalesced = 0
+        self.retry_after_count = 0
+        self.retry_after_seconds_total = 0.0
+        self.last_retry_after = 0.0
+
+    def start(self):
+        """Start the background workers"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker, name=f"telegram-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Telegram outbox started with {self.num_workers} workers")
+
+    def stop(self, drain_timeout: float = 10.0):
+        """Give queued messages up to drain_timeout seconds to go out, then stop the workers"""
+        deadline = time.monotonic() + drain_timeout
+        with self._cond:
+            while (self._size or self._in_flight) and self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(min(remaining, 0.5))
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        if self._size:
+            logger.warning(f"Telegram outbox stopped with {self._size} undelivered messages")
+            with self._cond:
+                undelivered = [message for chat_queue in (*self._queues.values(), *self._edit_queues.values())
+                               for message in chat_queue]
+                self._queues.clear()
+                self._edit_queues.clear()
+                self._queued_edits.clear()
+                self._size = 0
+            for message in undelivered:
+                self._notify_failed(message)
+
+    def enqueue(self, message: OutboxMessage) -> bool:
+        """Queue a message without blocking; returns False if the outbox is full"""
+        with self._cond:
+            if message.edit_message_id is not None:
+                queued = self._queued_edits.get((message.chat_id, message.edit_message_id))
+                if queued is not None:
+                    # Only the latest figures matter, so fold this edit into the queued one
+                    queued.text, queued.parse_mode, queued.token = message.text, message.parse_mode, message.token
+                    self.edits_coalesced += 1
+                    return True
+
+            if self._size >= self.max_size:
+                self.dropped += 1
+                logger.warning(f"Telegram outbox full ({self._size}), dropping message for chat {message.chat_id}")
+                return False
+            message.enqueued_at = time.monotonic()
+            self._push(message)
+            self._cond.notify()
+            return True
+
+    def _push(self, message: OutboxMessage, front: bool = False):
+        """Add a message to its chat's new-alert or edit queue; caller holds the lock"""
+        if message.edit_message_id is None:
+            chat_queue = self._queues.setdefault(message.chat_id, deque())
+        else:
+            chat_queue = self._edit_queues.setdefault(message.chat_id, deque())
+            self._queued_edits[(message.chat_id, message.edit_message_id)] = message
+        if front:
+            chat_queue.appendleft(message)
+        else:
+            chat_queue.append(message)
+        self._size += 1
+
+    def _pop(self, chat_id: str) -> OutboxMessage:
+        """Take the chat's next message, new alerts before edits; caller holds the lock"""
+        chat_queue = self._queues.get(chat_id)
+        if not chat_queue:
+            chat_queue = self._edit_queues[chat_id]
+        message = chat_queue.popleft()
+        if message.edit_message_id is not None:
+            self._queued_edits.pop((chat_id, message.edit_message_id), None)
+        self._size -= 1
+        return message
+
+    def pending(self) -> int:
+        return self._size
+
+    def _next_message(self) -> Optional[OutboxMessage]:
+        """Block until some chat has a message and budget to send it, or the outbox stops"""
+        with self._cond:
+            while self._running:
+                wait = self.global_bucket.time_until_available()
+                if wait <= 0:
+                    wait = None
+                    now = time.monotonic()
+                    for chat_id in self._queues.keys() | self._edit_queues.keys():
+                        if chat_id in self._in_flight:
+                            continue
+                        if not self._queues.get(chat_id) and not self._edit_queues.get(chat_id):
+                            continue
+                        held_for = self._held_until.get(chat_id, 0.0) - now
+                        if held_for > 0:
+                            wait = held_for if wait is None else min(wait, held_for)
+                            continue
+                        bucket = self.chat_bucket(chat_id)
+                        if bucket.try_acquire():
+                            self._in_flight.add(chat_id)
+                            return self._pop(chat_id)
+                        chat_wait = bucket.time_until_available()
+                        wait = chat_wait if wait is None else min(wait, chat_wait)
+                # Sleep until the earliest bucket refills, or until new work arrives
+                self._cond.wait(wait)
+            return None
+
+    def _worker(self):
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+
+            try:
+                # Another sender may have drawn on the global budget since we checked
+                self.global_bucket.acquire()
+                message.attempts += 1
+                result = self.deliver(message)
+                if result.ok:
+                    self.sent += 1
+                elif result.retry_after is not None:
+                    self._schedule_retry(message, result.retry_after)
+                else:
+                    self._fail(message, result.permanent)
+            except Exception as e:
+                logger.error(f"Error delivering outbox message to chat {message.chat_id}: {e}")
+                self._fail(message)
+            finally:
+                with self._cond:
+                    self._in_flight.discard(message.chat_id)
+                    if not self._queues.get(message.chat_id):
+                        self._queues.pop(message.chat_id, None)
+                    if not self._edit_queues.get(message.chat_id):
+                        self._edit_queues.pop(message.chat_id, None)
+                    self._cond.notify_all()
+
+    def _schedule_retry(self, message: OutboxMessage, retry_after: float):
+        """Hold the chat for retry_after seconds and put the message back at the head of its queue"""
+        self.retry_after_count += 1
+        self.retry_after_seconds_total += retry_after
+        self.last_retry_after = retry_after
+
+        if message.attempts >= CONFIG["telegram_max_send_attempts"]:
+            logger.error(f"Giving up on message for chat {message.chat_id} after {message.attempts} rate-limited attempts")
+            self._fail(message)
+            return
+
+        logger.warning(f"Telegram rate limited chat {message.chat_id}, retrying in {retry_after:.0f}s")
+        with self._cond:
+            self._held_until[message.chat_id] = time.monotonic() + retry_after
+            self._push(message, front=True)
+
+    def _fail(self, message: OutboxMessage, permanent: bool = False):
+        self.failed += 1
+        self._notify_failed(message, permanent)
+
+    def _notify_failed(self, message: OutboxMessage, permanent: bool = False):
+        if self.on_failed is None:
+            return
+        try:
+            self.on_failed(message, permanent)
+        except Exception as e:
+            logger.error(f"Error handling failed outbox message for chat {message.chat_id}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'pending': self._size,
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'edits_coalesced': self.edits_coalesced,
+            'retry_after_count': self.retry_after_count,
+            'retry_after_seconds_total': self.retry_after_seconds_total,
+            'last_retry_after': self.last_retry_after,
+        }
@@ -7,6 +7,7 @@ import requests
 import json
 from config import TELEGRAM_TOKEN, CHAT_ID, DEXSCREENER_ENDPOINTS, FALLBACK_ENDPOINTS
 from telegram_bot import TelegramNotifier
+from models import Token
 
 def test_telegram_connection():
     """Test Telegram bot connection"""
@@ -102,7 +103,7 @@ def test_sample_token_processing():
     print("\nTesting token processing...")
     
     # Sample DexScreener-style token data
-    sample_token = {
+    sample_token = Token.create(**{
         'address': '7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr',
         'name': 'Test Token',
         'symbol': 'TEST',
@@ -118,7 +119,7 @@ def test_sample_token_processing():
         'telegram': 'https://t.me/testtoken',
         'twitter': 'https://twitter.com/testtoken',
         'source': 'test'
-    }
+    })
     
     try:
         notifier = TelegramNotifier(TELEGRAM_TOKEN, CHAT_ID)
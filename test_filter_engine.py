@@ -0,0 +1,87 @@
+"""
+Tests for the batched token criteria in filter_engine
+"""
+
+import random
+import time
+
+import pytest
+
+from config import CONFIG
+from filter_engine import criteria_mask
+from models import Token
+
+NOW = 1_700_000_000.0
+
+
+def passes_criteria(token: Token, config, now: float) -> bool:
+    """The per-token rules the scanner applied before criteria_mask, as the reference"""
+    if not token.address or not token.name or not token.symbol:
+        return False
+
+    if token.is_pump_candidate:
+        min_cap = max(1000, config["min_market_cap"] // 10)
+        max_cap = config["max_market_cap"] * 5
+    else:
+        min_cap = config["min_market_cap"]
+        max_cap = config["max_market_cap"]
+    if token.market_cap > 0 and not (min_cap <= token.market_cap <= max_cap):
+        return False
+
+    if token.created_timestamp:
+        age_seconds = now - token.created_timestamp
+        max_age = config["max_age_seconds"] * 7 if token.is_pump_candidate else config["max_age_seconds"]
+        if not (config["min_age_seconds"] <= age_seconds <= max_age):
+            return False
+
+    min_liquidity = config["min_liquidity"] // 5 if token.is_pump_candidate else config["min_liquidity"]
+    if 0 < token.liquidity_usd < min_liquidity:
+        return False
+
+    return True
+
+
+def random_tokens(count: int, seed: int = 42):
+    """Tokens spread across every criterion's boundaries, with unknown (zero) values mixed in"""
+    rng = random.Random(seed)
+    max_age = CONFIG["max_age_seconds"] * 8
+    return [
+        Token.create(
+            address=f"addr{i}" if rng.random() > 0.02 else '',
+            name=f"Token {i}" if rng.random() > 0.02 else '',
+            symbol=f"TK{i}" if rng.random() > 0.02 else '',
+            chain='solana',
+            market_cap=0 if rng.random() < 0.1 else rng.uniform(0, CONFIG["max_market_cap"] * 6),
+            liquidity_usd=0 if rng.random() < 0.1 else rng.uniform(0, CONFIG["min_liquidity"] * 2),
+            created_timestamp=0 if rng.random() < 0.1 else NOW - rng.uniform(0, max_age),
+            is_pump_candidate=rng.random() < 0.5,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def tokens():
+    return random_tokens(20000)
+
+
+def test_criteria_mask_matches_per_token_rules(tokens):
+    expected = [passes_criteria(token, CONFIG, NOW) for token in tokens]
+    assert criteria_mask(tokens, now=NOW) == expected
+    # Both outcomes must actually occur, or the comparison proves little
+    assert any(expected) and not all(expected)
+
+
+def test_criteria_config_overrides_global(tokens):
+    config = {**CONFIG, "min_market_cap": 200000, "min_liquidity": 0}
+    expected = [passes_criteria(token, config, NOW) for token in tokens]
+    assert criteria_mask(tokens, config, now=NOW) == expected
+
+
+def test_empty_batch():
+    assert criteria_mask([]) == []
+
+
+def test_defaults_to_current_time():
+    token = Token.create(address='a', name='A', symbol='A', created_timestamp=time.time() - 60)
+    assert criteria_mask([token]) == [True]
@@ -0,0 +1,126 @@
+"""
+Tests for the subscriber profile index in subscriptions
+"""
+
+import json
+import random
+
+import pytest
+
+from config import CONFIG
+from filter_engine import criteria_mask
+from models import Token
+from subscriptions import RangeIndex, SubscriberProfile, SubscriptionIndex, load_profiles
+
+NOW = 1_700_000_000.0
+CHAINS = ['solana', 'ethereum', 'bsc', 'base']
+
+
+def random_profiles(count: int, rng: random.Random):
+    profiles = []
+    for i in range(count):
+        min_cap = rng.choice([0, 5000, 10000, 50000, 250000])
+        min_age = rng.choice([0, 5, 60, 3600])
+        profiles.append(SubscriberProfile.from_dict({
+            "chat_id": f"chat{i}",
+            "min_market_cap": min_cap,
+            "max_market_cap": min_cap + rng.choice([50000, 500000, 2000000]),
+            "min_age_seconds": min_age,
+            "max_age_seconds": min_age + rng.choice([600, 86400, 604800]),
+            "min_liquidity": rng.choice([0, 500, 2000, 10000]),
+            "chains": rng.sample(CHAINS, rng.randint(0, 2)),
+        }))
+    return profiles
+
+
+def random_tokens(count: int, rng: random.Random):
+    return [
+        Token.create(
+            address=f"addr{i}",
+            name=f"Token {i}" if rng.random() > 0.02 else '',
+            symbol=f"TK{i}",
+            chain=rng.choice(CHAINS + ['unknown']),
+            market_cap=0 if rng.random() < 0.1 else rng.uniform(0, 3000000),
+            liquidity_usd=0 if rng.random() < 0.1 else rng.uniform(0, 20000),
+            created_timestamp=0 if rng.random() < 0.1 else NOW - rng.uniform(0, 604800 * 8),
+            is_pump_candidate=rng.random() < 0.3,
+        )
+        for i in range(count)
+    ]
+
+
+def test_range_index_matches_brute_force():
+    rng = random.Random(7)
+    ranges = []
+    for i in range(40):
+        low = rng.choice([rng.uniform(0, 100), 0, 50])
+        ranges.append((low, low + rng.choice([0, rng.uniform(0, 100)]), 1 << i))
+    index = RangeIndex(ranges)
+
+    # Probe the exact bounds as well as random points, since off-by-one bisects fail there
+    probes = [rng.uniform(-10, 210) for _ in range(500)]
+    probes += [bound for low, high, _ in ranges for bound in (low, high)]
+    for value in probes:
+        expected = 0
+        for low, high, bit in ranges:
+            if low <= value <= high:
+                expected |= bit
+        assert index.match(value) == expected, value
+
+
+def test_match_agrees_with_criteria_mask_per_profile():
+    rng = random.Random(42)
+    profiles = random_profiles(60, rng)
+    tokens = random_tokens(1500, rng)
+    index = SubscriptionIndex(profiles)
+
+    expected = {token.address: [] for token in tokens}
+    for profile in profiles:
+        mask = criteria_mask(tokens, {**CONFIG, **profile.criteria()}, now=NOW)
+        for token, passes in zip(tokens, mask):
+            if passes and (not profile.chains or token.chain in profile.chains):
+                expected[token.address].append(profile.chat_id)
+
+    matched = 0
+    for token in tokens:
+        chat_ids = index.match(token, now=NOW)
+        assert sorted(chat_ids) == sorted(expected[token.address]), token
+        matched += bool(chat_ids)
+    # Make sure the comparison covered both outcomes
+    assert 0 < matched < len(tokens)
+
+
+def test_union_criteria_admits_everything_any_profile_matches():
+    rng = random.Random(3)
+    profiles = random_profiles(20, rng)
+    tokens = random_tokens(1000, rng)
+    index = SubscriptionIndex(profiles)
+
+    union_mask = criteria_mask(tokens, index.union_criteria(), now=NOW)
+    for token, passes in zip(tokens, union_mask):
+        if index.match(token, now=NOW):
+            assert passes, token
+
+
+def test_profile_defaults_come_from_config():
+    profile = SubscriberProfile.from_dict({"chat_id": 123})
+    assert profile.chat_id == "123"
+    assert profile.min_market_cap == CONFIG["min_market_cap"]
+    assert profile.chains == ()
+
+
+def test_load_profiles(tmp_path):
+    path = tmp_path / "subscriptions.json"
+    path.write_text(json.dumps([{"chat_id": "A", "min_market_cap": 100000, "chains": ["solana"]}]))
+    profiles = load_profiles(str(path), "default")
+    assert [p.chat_id for p in profiles] == ["A"]
+    assert profiles[0].chains == ("solana",)
+
+
+@pytest.mark.parametrize("contents", [None, "not json", '[{"min_market_cap": 1}]'])
+def test_load_profiles_falls_back_to_default_chat(tmp_path, contents):
+    path = tmp_path / "subscriptions.json"
+    if contents is not None:
+        path.write_text(contents)
+    profiles = load_profiles(str(path), "default")
+    assert [p.chat_id for p in profiles] == ["default"]
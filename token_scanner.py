@@ -3,85 +3,217 @@ Token Scanner - Fetches and processes token data from multiple sources
 """
 
 import requests
+import threading
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 import json
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from config import CONFIG, PUMP_FUN_ENDPOINTS, DEXSCREENER_ENDPOINTS, FALLBACK_ENDPOINTS, DEFAULT_HEADERS
+from fetcher import ConcurrentFetcher, Deadline
+from cache import TTLCache, MISSING
+from circuit_breaker import EndpointHealth
+from models import Token
+from filter_engine import criteria_mask
+from dedup_store import create_dedup_set
+from adaptive_poller import AdaptivePoller, content_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Returned by _get_pump_fun_json when the response matches the last one processed
+UNCHANGED = object()
+
+# Wrapped SOL, whose DexScreener price converts SOL-denominated market caps to USD
+WRAPPED_SOL_MINT = "So11111111111111111111111111111111111111112"
+
+# Social links a coin's metadata JSON may carry
+METADATA_SOCIALS = ('website', 'telegram', 'twitter')
+
+
+@dataclass
+class EndpointFetch:
+    """Tokens from one endpoint fetch, with the state updates held back until they are taken.
+
+    Marking a response processed or moving the Pump.fun cursor means its coins
+    won't be fetched again, so a worker whose result is dropped must not apply them.
+    """
+
+    tokens: List[Token]
+    updates: List[Callable[[], None]] = field(default_factory=list)
+
+    def commit(self):
+        for update in self.updates:
+            update()
+
 class TokenScanner:
     """Scans multiple cryptocurrency APIs for new token listings"""
     
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
-        self.seen_tokens: Set[str] = set()
-        self.last_cleanup = datetime.now()
+        self.fetcher = ConcurrentFetcher(self.session)
+        self.endpoint_health = EndpointHealth()
+        self.market_data_cache = TTLCache(
+            maxsize=CONFIG["market_data_cache_size"],
+            ttl_seconds=CONFIG["market_data_cache_ttl_seconds"]
+        )
+        self.seen_tokens = create_dedup_set("seen", CONFIG["seen_tokens_ttl_seconds"])
+        # Called with fresh data for tokens that were already seen, so alerts can be updated
+        self.update_listener: Optional[Callable[[Token], None]] = None
+        # Criteria for the pre-filter; None means the global CONFIG
+        self.criteria_config: Optional[Dict[str, Any]] = None
+        # With adaptive polling each scan only fetches the endpoints that are due
+        self.poller: Optional[AdaptivePoller] = AdaptivePoller() if CONFIG["adaptive_polling"] else None
+        # High-water mark for newest-first Pump.fun feeds: (created_timestamp, mints at that timestamp)
+        self.pump_fun_cursor: Optional[Tuple[float, Set[str]]] = None
+        # The REST scan and the WebSocket stream both move the cursor
+        self._cursor_lock = threading.Lock()
         
     def cleanup_seen_tokens(self):
-        """Clean up old entries from seen_tokens set"""
-        if (datetime.now() - self.last_cleanup).total_seconds() > 3600:  # Cleanup every hour
-            self.seen_tokens.clear()
-            self.last_cleanup = datetime.now()
-            logger.info("Cleaned up seen tokens cache")
-    
-    def scan_all_sources(self) -> List[Dict]:
-        """Scan both DexScreener and Pump.fun sources"""
-        self.cleanup_seen_tokens()
-        
-        all_tokens = []
-        
-        # Scan DexScreener profiles first
-        logger.info("Starting DexScreener profile scan...")
-        dex_tokens = self._scan_dexscreener()
-        all_tokens.extend(dex_tokens)
-        logger.info(f"DexScreener found {len(dex_tokens)} tokens")
-        
-        # Also scan Pump.fun as backup
-        logger.info("Starting Pump.fun scan...")
-        pump_tokens = self._scan_pump_fun()
-        all_tokens.extend(pump_tokens)
-        logger.info(f"Pump.fun found {len(pump_tokens)} tokens")
+        """Drop seen_tokens entries whose TTL has expired"""
+        expired = self.seen_tokens.expire()
+        if expired:
+            logger.info(f"Expired {expired} seen tokens, {len(self.seen_tokens)} still tracked")
+    
+    def scan_all_sources(self) -> List[Token]:
+        """Scan DexScreener and Pump.fun sources concurrently"""
+        return list(self.stream_all_sources())
+    
+    def stream_all_sources(self, deadline: Optional[Deadline] = None) -> Iterator[Token]:
+        """Scan all sources as a streaming pipeline: fetch -> standardize -> dedupe -> filter.
         
-        # Remove duplicates and filter by age and profile requirements
-        unique_tokens = self._deduplicate_tokens(all_tokens)
-        filtered_tokens = self._filter_tokens(unique_tokens)
+        Tokens are yielded as soon as the source response they came from arrives, so
+        callers can alert on fast sources without waiting for slow ones. With a
+        deadline, the scan ends when it passes and whatever arrived so far stands.
+        A response only counts as processed once all its tokens have been consumed.
+        """
+        self.cleanup_seen_tokens()
+        stats = {'total': 0, 'unique': 0, 'filtered': 0}
         
-        logger.info(f"Scan summary - Total: {len(all_tokens)}, Unique: {len(unique_tokens)}, Filtered: {len(filtered_tokens)}")
+        responses = self._fetch_stage(stats, deadline)
+        unique_batches = self._dedupe_stage(responses, stats)
+        yield from self._filter_stage(unique_batches, stats)
         
-        return filtered_tokens
+        if deadline is not None and deadline.expired():
+            logger.warning(f"Scan hit its {deadline.seconds:.0f}s deadline, results are partial")
+        logger.info(f"Scan summary - Total: {stats['total']}, Unique: {stats['unique']}, Filtered: {stats['filtered']}")
+        response_stats = self.fetcher.response_stats().values()
+        logger.info(f"Unchanged responses skipped - Not modified: {sum(s['not_modified'] for s in response_stats)}, "
+                    f"Identical body: {sum(s['unchanged_body'] for s in response_stats)}")
+        if self.poller is not None:
+            logger.info(f"Adaptive polling: {self.poller.polls_per_minute():.1f} polls/min "
+                        f"(budget {self.poller.budget_per_minute:.1f})")
     
-    def _scan_pump_fun(self) -> List[Dict]:
-        """Scan Pump.fun API endpoints"""
-        logger.info("Scanning Pump.fun endpoints...")
-        tokens = []
-        maintenance_count = 0
+    def _fetch_stage(self, stats: Dict[str, int], deadline: Optional[Deadline] = None) -> Iterator[List[Token]]:
+        """Fetch and standardize every source endpoint, yielding each response's tokens on arrival"""
+        # Fire every source request at once; a scan takes as long as its slowest endpoint.
+        # Endpoints with open circuits are skipped, the rest go out healthiest first.
+        dex_endpoints, pump_endpoints = DEXSCREENER_ENDPOINTS, PUMP_FUN_ENDPOINTS
+        if self.poller is not None:
+            # Ask the breakers only about endpoints that will be fetched: admitting a
+            # half-open endpoint reserves its single probe
+            dex_endpoints = self.poller.take_due(dex_endpoints)
+            pump_endpoints = self.poller.take_due(pump_endpoints)
+        due_pump_count = len(pump_endpoints)
+        dex_endpoints = self.endpoint_health.prioritize(dex_endpoints)
+        pump_endpoints = self.endpoint_health.prioritize(pump_endpoints)
+        jobs = [('dexscreener', endpoint) for endpoint in dex_endpoints]
+        jobs += [('pump.fun', endpoint) for endpoint in pump_endpoints]
+        logger.info(f"Fetching {len(jobs)} source endpoints concurrently...")
+        if not jobs:
+            return
         
-        for endpoint in PUMP_FUN_ENDPOINTS:
-            try:
-                endpoint_tokens = self._fetch_pump_fun_endpoint(endpoint)
-                if endpoint_tokens:
-                    tokens.extend(endpoint_tokens)
-                else:
-                    maintenance_count += 1
-                time.sleep(CONFIG["rate_limit_delay"])
-            except Exception as e:
-                logger.error(f"Error scanning Pump.fun endpoint {endpoint}: {e}")
-                maintenance_count += 1
-                continue
+        source_counts = {'dexscreener': 0, 'pump.fun': 0}
+        # Only endpoints that were due this scan count; one the poller held back hasn't failed
+        maintenance_count = due_pump_count - len(pump_endpoints)
+        unfinished = set(jobs)
+        try:
+            results = self.fetcher.iter_completed(lambda job: self._fetch_source_endpoint(job, deadline), jobs,
+                                                  default=None, deadline=deadline)
+            for job, fetch in results:
+                unfinished.discard(job)
+                source = job[0]
+                if fetch is None:
+                    # Failed or empty; an unchanged response or nothing new returns no tokens instead
+                    if source == 'pump.fun':
+                        maintenance_count += 1
+                    fetch = EndpointFetch([])
+                endpoint_tokens = fetch.tokens
+                source_counts[source] += len(endpoint_tokens)
+                stats['total'] += len(endpoint_tokens)
+                yield endpoint_tokens
+                # Resumed only once downstream has taken every token of this response. A scan
+                # closed early (max_tokens_per_scan) or a result dropped at the deadline never
+                # gets here, so those coins are not skipped as unchanged or below the cursor
+                fetch.commit()
+        finally:
+            # Jobs abandoned at the deadline may hold a half-open probe that will never be answered
+            for _, endpoint in unfinished:
+                self.endpoint_health.release_probe(endpoint)
         
-        if maintenance_count >= len(PUMP_FUN_ENDPOINTS):
+        if due_pump_count and maintenance_count >= due_pump_count:
             logger.warning("All Pump.fun endpoints appear to be in maintenance mode")
+        logger.info(f"DexScreener found {source_counts['dexscreener']} tokens")
+        logger.info(f"Pump.fun found {source_counts['pump.fun']} tokens")
+    
+    def _dedupe_stage(self, batches: Iterable[List[Token]], stats: Dict[str, int]) -> Iterator[List[Token]]:
+        """Drop tokens already produced earlier in this scan by another source"""
+        seen_addresses: Set[str] = set()
+        for batch in batches:
+            unique_tokens = self._deduplicate_tokens(batch, seen_addresses)
+            stats['unique'] += len(unique_tokens)
+            if unique_tokens:
+                yield unique_tokens
+    
+    def _filter_stage(self, batches: Iterable[List[Token]], stats: Dict[str, int]) -> Iterator[Token]:
+        """Apply the configured criteria and cross-scan dedup, yielding tokens one by one"""
+        for batch in batches:
+            filtered_tokens = self._filter_tokens(batch)
+            stats['filtered'] += len(filtered_tokens)
+            yield from filtered_tokens
+    
+    def _fetch_source_endpoint(self, job: Tuple[str, str], deadline: Optional[Deadline] = None) -> Optional[EndpointFetch]:
+        """Fetch a single (source, endpoint) job on a fetcher worker, returning None if it failed or was empty"""
+        source, endpoint = job
+        if source == 'dexscreener':
+            return self._fetch_dexscreener_endpoint(endpoint, deadline)
+        return self._fetch_pump_fun_endpoint(endpoint, deadline)
+    
+    def _fetch_pump_fun_endpoint(self, endpoint: str, deadline: Optional[Deadline] = None) -> Optional[EndpointFetch]:
+        """Fetch tokens from a single Pump.fun endpoint with retry logic; None if it failed or listed no coins"""
+        if CONFIG["pump_fun_incremental"] and self._is_newest_first_endpoint(endpoint):
+            return self._fetch_pump_fun_incremental(endpoint, deadline)
         
-        logger.info(f"Found {len(tokens)} tokens from Pump.fun")
-        return tokens
+        data = self._get_pump_fun_json(endpoint, conditional=True, deadline=deadline)
+        if data is None:
+            return None
+        if data is UNCHANGED:
+            if self.poller is not None:
+                self.poller.record_change(endpoint, False)
+            return EndpointFetch([])
+        
+        coins = self._extract_pump_fun_coins(data)
+        if self.poller is not None:
+            self.poller.record_fingerprint(endpoint, content_fingerprint(coin.get('mint') or '' for coin in coins))
+        tokens = self._process_pump_fun_response(data)
+        logger.info(f"Successfully fetched {len(tokens)} tokens from {endpoint}")
+        if not coins:
+            # An empty listing is how Pump.fun looks during maintenance
+            return None
+        reuse_seconds = self._pump_fun_reuse_seconds(coins)
+        return EndpointFetch(tokens, [lambda: self.fetcher.mark_processed(endpoint, reuse_seconds)])
     
-    def _fetch_pump_fun_endpoint(self, endpoint: str) -> List[Dict]:
-        """Fetch tokens from a single Pump.fun endpoint with retry logic"""
+    def _get_pump_fun_json(self, endpoint: str, health_key: str = None, conditional: bool = False,
+                           deadline: Optional[Deadline] = None) -> Optional[Any]:
+        """Fetch and decode a Pump.fun endpoint, returning None on failure.
+        
+        With conditional, returns UNCHANGED instead of decoding a response that
+        matches the last one processed for the endpoint.
+        """
+        health_key = health_key or endpoint
         for attempt in range(CONFIG["max_retries"]):
             try:
                 logger.info(f"Fetching Pump.fun (attempt {attempt + 1}): {endpoint}")
@@ -92,18 +224,31 @@ class TokenScanner:
                     'Origin': 'https://pump.fun'
                 }
                 
-                response = self.session.get(
-                    endpoint, 
-                    headers=headers, 
-                    timeout=CONFIG["request_timeout"]
-                )
+                started = time.monotonic()
+                if conditional:
+                    response, changed = self.fetcher.get_if_changed(
+                        endpoint,
+                        deadline=deadline,
+                        headers=headers,
+                        timeout=CONFIG["request_timeout"]
+                    )
+                    if not changed:
+                        self.endpoint_health.record_success(health_key, time.monotonic() - started)
+                        logger.info(f"Pump.fun response unchanged, skipping: {endpoint}")
+                        return UNCHANGED
+                else:
+                    response = self.fetcher.get(
+                        endpoint, 
+                        deadline=deadline,
+                        headers=headers, 
+                        timeout=CONFIG["request_timeout"]
+                    )
                 
                 if response.status_code == 200:
                     try:
                         data = response.json()
-                        tokens = self._process_pump_fun_response(data)
-                        logger.info(f"Successfully fetched {len(tokens)} tokens from {endpoint}")
-                        return tokens
+                        self.endpoint_health.record_success(health_key, time.monotonic() - started)
+                        return data
                     except json.JSONDecodeError:
                         logger.error(f"Invalid JSON response from {endpoint}")
                         continue
@@ -117,31 +262,231 @@ class TokenScanner:
                     break
                     
             except requests.exceptions.RequestException as e:
+                # The next attempt is paced by the per-host rate limiter in the fetcher
                 logger.error(f"Request error for {endpoint} (attempt {attempt + 1}): {e}")
-                if attempt < CONFIG["max_retries"] - 1:
-                    time.sleep(5)
-                    continue
+                continue
                     
+        self._record_failure(health_key, deadline)
+        return None
+    
+    def _pump_fun_reuse_seconds(self, coins: List[Dict]) -> float:
+        """How long an unchanged response can be skipped: until its youngest coin is old enough to pass"""
+        reuse_seconds = CONFIG["response_reuse_seconds"]
+        now = time.time()
+        for coin in coins:
+            matures_in = (coin.get('created_timestamp') or 0) + CONFIG["min_age_seconds"] - now
+            if matures_in > 0:
+                reuse_seconds = min(reuse_seconds, matures_in)
+        return reuse_seconds
+    
+    def _record_failure(self, endpoint: str, deadline: Optional[Deadline] = None):
+        """Count a failure against an endpoint, unless it was our own deadline that cut it short"""
+        if deadline is not None and deadline.expired():
+            # Says nothing about the endpoint; let a half-open circuit probe again next time
+            self.endpoint_health.release_probe(endpoint)
+        else:
+            self.endpoint_health.record_failure(endpoint)
+    
+    def ingest_pump_fun_coins(self, coins: List[Dict]) -> Iterator[Token]:
+        """Run coins pushed by the WebSocket stream through the same standardize and filter path"""
+        self._complete_streamed_coins(coins, Deadline(CONFIG["request_timeout"]))
+        tokens = self._process_pump_fun_coins(coins, limit=len(coins))
+        filtered_tokens = self._filter_tokens(self._deduplicate_tokens(tokens))
+        logger.info(f"Stream ingest: {len(coins)} coins, {len(tokens)} tokens, {len(filtered_tokens)} passed filters")
+        yield from filtered_tokens
+        # Streamed coins are now covered, so a later backfill only pages back to here. Left
+        # out if the consumer stopped early, so the coins it didn't take are fetched again
+        self._advance_pump_fun_cursor(coins)
+    
+    def _complete_streamed_coins(self, coins: List[Dict], deadline: Deadline):
+        """Fill in what new-token events lack compared to the REST API: a USD market cap and socials.
+        
+        Events price the coin in SOL (marketCapSol), and socials only live in the
+        metadata JSON at the coin's uri, fetched here concurrently.
+        """
+        needs_price = [coin for coin in coins
+                       if 'market_cap' not in coin and isinstance(coin.get('marketCapSol'), (int, float))]
+        if needs_price:
+            sol_price = self._sol_price_usd(deadline)
+            if sol_price:
+                for coin in needs_price:
+                    coin['market_cap'] = coin['marketCapSol'] * sol_price
+            else:
+                # Leave market_cap unset rather than compare SOL against USD criteria
+                logger.warning(f"No SOL price available, {len(needs_price)} streamed coins have no USD market cap")
+        
+        needs_socials = [coin for coin in coins if coin.get('uri') and not any(coin.get(key) for key in METADATA_SOCIALS)]
+        metadata = self.fetcher.map(lambda coin: self._fetch_coin_metadata(coin['uri'], deadline), needs_socials, default=None)
+        for coin, coin_metadata in zip(needs_socials, metadata):
+            if coin_metadata:
+                for key in METADATA_SOCIALS:
+                    coin.setdefault(key, coin_metadata.get(key) or '')
+    
+    def _sol_price_usd(self, deadline: Optional[Deadline] = None) -> float:
+        """SOL/USD from CONFIG, or else the deepest wrapped SOL pair on DexScreener (cached with market data)"""
+        if CONFIG["sol_price_usd"]:
+            return CONFIG["sol_price_usd"]
+        pair = self._fetch_market_data_batch([('solana', WRAPPED_SOL_MINT)], deadline).get(('solana', WRAPPED_SOL_MINT))
+        try:
+            return float(pair['priceUsd']) if pair else 0.0
+        except (TypeError, ValueError):
+            return 0.0
+    
+    def _fetch_coin_metadata(self, uri: str, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        """Fetch a coin's metadata JSON; social links sit at the top level or under extensions"""
+        try:
+            response = self.fetcher.get(uri, deadline=deadline, timeout=CONFIG["request_timeout"])
+            if response.status_code != 200:
+                logger.debug(f"Metadata error {response.status_code} for {uri}")
+                return None
+            metadata = response.json()
+            if not isinstance(metadata, dict):
+                return None
+            extensions = metadata.get('extensions')
+            return {**extensions, **metadata} if isinstance(extensions, dict) else metadata
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.debug(f"Could not fetch metadata from {uri}: {e}")
+            return None
+    
+    def backfill_pump_fun(self) -> Iterator[Token]:
+        """Catch up on launches missed while the stream was down, via the incremental cursor"""
+        endpoints = [endpoint for endpoint in PUMP_FUN_ENDPOINTS if self._is_newest_first_endpoint(endpoint)]
+        if not endpoints:
+            return
+        # Runs beside the scheduled scans, so it gets a deadline of its own rather than theirs
+        fetch = self._fetch_pump_fun_incremental(endpoints[0], Deadline(CONFIG["scan_deadline_seconds"]))
+        if fetch is None:
+            return
+        yield from self._filter_tokens(self._deduplicate_tokens(fetch.tokens))
+        # As in a scan, the cursor only moves once every token has been taken
+        fetch.commit()
+    
+    def _is_newest_first_endpoint(self, endpoint: str) -> bool:
+        """Check if an endpoint lists coins newest first, so a high-water mark applies"""
+        query = parse_qs(urlparse(endpoint).query)
+        return query.get('sort') == ['created_timestamp'] and query.get('order') == ['DESC']
+    
+    def _with_offset(self, endpoint: str, offset: int) -> str:
+        """Return the endpoint URL with its offset query parameter replaced"""
+        parts = urlparse(endpoint)
+        query = parse_qs(parts.query)
+        query['offset'] = [str(offset)]
+        return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+    
+    def _fetch_pump_fun_incremental(self, endpoint: str, deadline: Optional[Deadline] = None) -> Optional[EndpointFetch]:
+        """Page through a newest-first endpoint until reaching the last processed coin.
+        
+        Returns None if the first page failed or listed no coins, and no tokens if
+        nothing launched since the last fetch. The cursor moves on commit.
+        """
+        query = parse_qs(urlparse(endpoint).query)
+        page_size = int(query.get('limit', ['100'])[0])
+        start_offset = int(query.get('offset', ['0'])[0])
+        
+        # Without a cursor there is nothing to catch up on, so one page is enough
+        cursor = self.pump_fun_cursor
+        max_pages = CONFIG["pump_fun_max_pages"] if cursor else 1
+        
+        new_coins = []
+        reached_cursor = False
+        interrupted = False
+        first_page_coins = []
+        for page in range(max_pages):
+            page_url = self._with_offset(endpoint, start_offset + page * page_size)
+            # An unchanged first page means nothing launched above the mark since last time
+            data = self._get_pump_fun_json(page_url, health_key=endpoint, conditional=page == 0, deadline=deadline)
+            if data is UNCHANGED:
+                if self.poller is not None:
+                    self.poller.record_change(endpoint, False)
+                return EndpointFetch([])
+            if data is None:
+                if page == 0:
+                    return None
+                interrupted = True
+                break
+            
+            raw_coins = self._extract_pump_fun_coins(data)
+            if page == 0:
+                if not raw_coins:
+                    return None
+                first_page_coins = raw_coins
+            for coin in raw_coins:
+                if cursor and self._is_at_or_before_cursor(coin, cursor):
+                    reached_cursor = True
+                    break
+                new_coins.append(coin)
+            
+            if reached_cursor or len(raw_coins) < page_size:
+                break
+        
+        if cursor and not reached_cursor and new_coins:
+            logger.warning(f"Pump.fun cursor not reached after {max_pages} pages, some launches may have been missed")
+        
+        if self.poller is not None and not interrupted:
+            # Anything above the high-water mark is, by definition, new content
+            self.poller.record_change(endpoint, bool(new_coins))
+        
+        updates = []
+        if interrupted and cursor:
+            # A later page failed or ran into the scan deadline; keep the old mark so the
+            # next scan pages back over the gap instead of skipping it
+            logger.warning(f"Pump.fun paging interrupted for {endpoint}, not advancing cursor")
+        else:
+            first_page_url = self._with_offset(endpoint, start_offset)
+            reuse_seconds = self._pump_fun_reuse_seconds(first_page_coins)
+            updates.append(lambda: self._advance_pump_fun_cursor(new_coins))
+            updates.append(lambda: self.fetcher.mark_processed(first_page_url, reuse_seconds))
+        
+        tokens = self._process_pump_fun_coins(new_coins, limit=max_pages * page_size)
+        logger.info(f"Incremental Pump.fun fetch: {len(new_coins)} new coins, {len(tokens)} tokens from {endpoint}")
+        return EndpointFetch(tokens, updates)
+    
+    def _is_at_or_before_cursor(self, coin: Dict, cursor: Tuple[float, Set[str]]) -> bool:
+        """Check if a coin was already covered by the high-water mark"""
+        cursor_timestamp, cursor_mints = cursor
+        created_timestamp = coin.get('created_timestamp') or 0
+        if created_timestamp != cursor_timestamp:
+            return created_timestamp < cursor_timestamp
+        return coin.get('mint') in cursor_mints
+    
+    def _advance_pump_fun_cursor(self, coins: List[Dict]):
+        """Move the high-water mark to the newest coin old enough to have been evaluated"""
+        # Coins younger than min_age_seconds were rejected by the age check, so keep them
+        # above the mark and look at them again on the next scan
+        newest_eligible = time.time() - CONFIG["min_age_seconds"]
+        
+        with self._cursor_lock:
+            for coin in coins:
+                created_timestamp = coin.get('created_timestamp')
+                if not created_timestamp or created_timestamp > newest_eligible or not coin.get('mint'):
+                    continue
+                
+                if self.pump_fun_cursor is None or created_timestamp > self.pump_fun_cursor[0]:
+                    self.pump_fun_cursor = (created_timestamp, {coin['mint']})
+                elif created_timestamp == self.pump_fun_cursor[0]:
+                    self.pump_fun_cursor[1].add(coin['mint'])
+    
+    def _extract_pump_fun_coins(self, data: Any) -> List[Dict]:
+        """Extract the raw coin list from the different Pump.fun response structures"""
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            if 'coins' in data:
+                return data['coins']
+            if 'data' in data:
+                return data['data'] if isinstance(data['data'], list) else [data['data']]
+            return [data]  # Single token response
         return []
     
-    def _process_pump_fun_response(self, data: Any) -> List[Dict]:
+    def _process_pump_fun_response(self, data: Any) -> List[Token]:
         """Process Pump.fun API response and extract token data"""
+        return self._process_pump_fun_coins(self._extract_pump_fun_coins(data))
+    
+    def _process_pump_fun_coins(self, raw_tokens: List[Dict], limit: int = 100) -> List[Token]:
+        """Validate, age-check and standardize raw Pump.fun coins"""
         tokens = []
         
         try:
-            # Handle different response structures
-            if isinstance(data, list):
-                raw_tokens = data
-            elif isinstance(data, dict):
-                if 'coins' in data:
-                    raw_tokens = data['coins']
-                elif 'data' in data:
-                    raw_tokens = data['data'] if isinstance(data['data'], list) else [data['data']]
-                else:
-                    raw_tokens = [data]  # Single token response
-            else:
-                return tokens
-            
             current_time = datetime.now()
             
             for token in raw_tokens:
@@ -161,12 +506,12 @@ class TokenScanner:
                             tokens.append(standardized_token)
             
             # Sort by creation time (newest first)
-            tokens.sort(key=lambda x: x.get('created_timestamp', 0), reverse=True)
+            tokens.sort(key=lambda x: x.created_timestamp, reverse=True)
             
         except Exception as e:
             logger.error(f"Error processing Pump.fun response: {e}")
         
-        return tokens[:100]  # Limit to 100 most recent
+        return tokens[:limit]  # Limit to most recent
     
     def _is_valid_pump_fun_token(self, token: Dict) -> bool:
         """Validate Pump.fun token structure"""
@@ -185,78 +530,71 @@ class TokenScanner:
         except Exception:
             return False
     
-    def _standardize_pump_fun_token(self, token: Dict) -> Optional[Dict]:
+    def _standardize_pump_fun_token(self, token: Dict) -> Optional[Token]:
         """Convert Pump.fun token to standard format"""
         try:
-            return {
-                'address': token['mint'],
-                'name': token['name'],
-                'symbol': token['symbol'],
-                'chain': 'solana',
-                'market_cap': token.get('market_cap', 0),
-                'price_usd': token.get('usd_market_cap', 0) / token.get('market_cap', 1) if token.get('market_cap', 0) > 0 else 0,
-                'liquidity_usd': token.get('virtual_sol_reserves', 0) * 100,  # Estimate
-                'volume_24h': token.get('volume_24h', 0),
-                'price_change_24h': 0,  # Not available in Pump.fun API
-                'created_timestamp': token['created_timestamp'],
-                'pair_created_at': token['created_timestamp'] * 1000,  # Convert to milliseconds
-                'website': token.get('website', ''),
-                'telegram': token.get('telegram', ''),
-                'twitter': token.get('twitter', ''),
-                'source': 'pump.fun'
-            }
+            return Token.create(
+                address=token['mint'],
+                name=token['name'],
+                symbol=token['symbol'],
+                chain='solana',
+                market_cap=token.get('market_cap', 0),
+                price_usd=token.get('usd_market_cap', 0) / token.get('market_cap', 1) if token.get('market_cap', 0) > 0 else 0,
+                liquidity_usd=token.get('virtual_sol_reserves', 0) * 100,  # Estimate
+                volume_24h=token.get('volume_24h', 0),
+                price_change_24h=0,  # Not available in Pump.fun API
+                created_timestamp=token['created_timestamp'],
+                pair_created_at=token['created_timestamp'] * 1000,  # Convert to milliseconds
+                website=token.get('website'),
+                telegram=token.get('telegram'),
+                twitter=token.get('twitter'),
+                source='pump.fun'
+            )
         except Exception as e:
             logger.error(f"Error standardizing Pump.fun token: {e}")
             return None
     
-    def _scan_dexscreener(self) -> List[Dict]:
-        """Scan DexScreener token profiles endpoint only"""
-        logger.info("Scanning DexScreener token profiles...")
-        tokens = []
-        
-        # Only use the token-profiles endpoint
-        for endpoint in DEXSCREENER_ENDPOINTS:
-            try:
-                endpoint_tokens = self._fetch_dexscreener_endpoint(endpoint)
-                if endpoint_tokens:
-                    tokens.extend(endpoint_tokens)
-                    logger.info(f"Successfully got {len(endpoint_tokens)} tokens from profiles endpoint")
-                time.sleep(CONFIG["rate_limit_delay"])
-            except Exception as e:
-                logger.error(f"Error scanning DexScreener profiles endpoint {endpoint}: {e}")
-                continue
-        
-        logger.info(f"Found {len(tokens)} tokens from DexScreener profiles")
-        return tokens
-    
-    def _fetch_dexscreener_endpoint(self, endpoint: str) -> List[Dict]:
-        """Fetch tokens from a single DexScreener endpoint"""
+    def _fetch_dexscreener_endpoint(self, endpoint: str, deadline: Optional[Deadline] = None) -> Optional[EndpointFetch]:
+        """Fetch tokens from a single DexScreener endpoint, returning None on failure"""
         try:
             logger.info(f"Fetching DexScreener: {endpoint}")
             
-            response = self.session.get(endpoint, timeout=CONFIG["request_timeout"])
+            started = time.monotonic()
+            response, changed = self.fetcher.get_if_changed(endpoint, deadline=deadline,
+                                                            timeout=CONFIG["request_timeout"])
+            
+            if not changed:
+                self.endpoint_health.record_success(endpoint, time.monotonic() - started)
+                if self.poller is not None:
+                    self.poller.record_change(endpoint, False)
+                logger.info(f"DexScreener response unchanged, skipping: {endpoint}")
+                return EndpointFetch([])
             
             if response.status_code == 200:
                 data = response.json()
+                self.endpoint_health.record_success(endpoint, time.monotonic() - started)
                 logger.info(f"DexScreener API response type: {type(data)}, length: {len(data) if isinstance(data, list) else 'N/A'}")
                 if isinstance(data, list) and len(data) > 0:
                     logger.info(f"First item structure: {list(data[0].keys()) if isinstance(data[0], dict) else 'Not a dict'}")
                 elif isinstance(data, dict):
                     logger.info(f"Response keys: {list(data.keys())}")
                 
-                tokens = self._process_dexscreener_response(data)
+                tokens = self._process_dexscreener_response(data, deadline)
+                if self.poller is not None:
+                    self.poller.record_fingerprint(endpoint, content_fingerprint(token.token_id for token in tokens))
                 logger.info(f"Successfully fetched {len(tokens)} tokens from DexScreener")
-                return tokens
+                return EndpointFetch(tokens, [lambda: self.fetcher.mark_processed(endpoint, CONFIG["response_reuse_seconds"])])
             else:
                 logger.error(f"DexScreener API error {response.status_code} for {endpoint}: {response.text}")
                 
         except Exception as e:
             logger.error(f"Error fetching DexScreener endpoint {endpoint}: {e}")
-            
-        return []
+        
+        self._record_failure(endpoint, deadline)
+        return None
     
-    def _process_dexscreener_response(self, data: Any) -> List[Dict]:
-        """Process DexScreener token profiles response"""
+    def _process_dexscreener_response(self, data: Any, deadline: Optional[Deadline] = None) -> List[Token]:
+        """Process DexScreener token profiles response; deadline bounds the market data enrichment"""
         tokens = []
         
         try:
@@ -269,6 +607,11 @@ class TokenScanner:
                 skipped_no_address = 0
                 skipped_age = 0
                 
+                # Enrich every profile up front with a handful of batched market data requests
+                token_keys = [(item.get('chainId', 'solana'), item.get('tokenAddress')) for item in data
+                              if isinstance(item, dict) and item.get('tokenAddress')]
+                market_data = self._fetch_market_data_batch(token_keys, deadline)
+                
                 for item in data:
                     if isinstance(item, dict):
                         processed_count += 1
@@ -292,15 +635,12 @@ class TokenScanner:
                             # Use first part of description as name
                             token_name = description.split(' ')[0] if description else token_name
                         
-                        # Try to get real market data for this token
-                        real_pair_data = self._fetch_token_market_data(token_address, chain_id)
-                        
-                        # Rate limit the API calls
-                        time.sleep(0.1)  # 100ms delay between requests
+                        # Use real market data for this token if the enrichment stage found any
+                        real_pair_data = market_data.get((chain_id, token_address))
                         
                         if real_pair_data:
-                            # Use real market data
-                            fake_pair = real_pair_data
+                            # Use real market data (copied, since the cache keeps the original)
+                            fake_pair = {**real_pair_data, 'info': dict(real_pair_data.get('info') or {})}
                             # Update token name and symbol from real data if available
                             base_token = real_pair_data.get('baseToken', {})
                             if base_token.get('name'):
@@ -372,7 +712,7 @@ class TokenScanner:
                 logger.warning(f"Unexpected DexScreener response format: {type(data)}")
             
             # Sort by creation time (newest first)
-            tokens.sort(key=lambda x: x.get('pair_created_at', 0), reverse=True)
+            tokens.sort(key=lambda x: x.pair_created_at, reverse=True)
             
         except Exception as e:
             logger.error(f"Error processing DexScreener profiles response: {e}")
@@ -400,7 +740,7 @@ class TokenScanner:
         except Exception:
             return False
     
-    def _standardize_dexscreener_pair(self, pair: Dict) -> Optional[Dict]:
+    def _standardize_dexscreener_pair(self, pair: Dict) -> Optional[Token]:
         """Convert DexScreener pair to standard format"""
         try:
             base_token = pair['baseToken']
@@ -408,55 +748,121 @@ class TokenScanner:
             # Extract social links
             social_links = self._extract_social_links(pair)
             
-            return {
-                'address': base_token['address'],
-                'name': base_token['name'],
-                'symbol': base_token['symbol'],
-                'chain': pair.get('chainId', 'unknown'),
-                'market_cap': pair.get('marketCap', 0),
-                'price_usd': float(pair.get('priceUsd', 0)),
-                'liquidity_usd': pair.get('liquidity', {}).get('usd', 0),
-                'volume_24h': pair.get('volume', {}).get('h24', 0),
-                'price_change_24h': pair.get('priceChange', {}).get('h24', 0),
-                'created_timestamp': pair.get('pairCreatedAt', 0) // 1000,
-                'pair_created_at': pair.get('pairCreatedAt', 0),
-                'website': social_links.get('website', ''),
-                'telegram': social_links.get('telegram', ''),
-                'twitter': social_links.get('twitter', ''),
-                'source': 'dexscreener'
-            }
+            return Token.create(
+                address=base_token['address'],
+                name=base_token['name'],
+                symbol=base_token['symbol'],
+                chain=pair.get('chainId', 'unknown'),
+                market_cap=pair.get('marketCap', 0),
+                price_usd=pair.get('priceUsd', 0),
+                liquidity_usd=pair.get('liquidity', {}).get('usd', 0),
+                volume_24h=pair.get('volume', {}).get('h24', 0),
+                price_change_24h=pair.get('priceChange', {}).get('h24', 0),
+                created_timestamp=pair.get('pairCreatedAt', 0) // 1000,
+                pair_created_at=pair.get('pairCreatedAt', 0),
+                website=social_links.get('website', ''),
+                telegram=social_links.get('telegram', ''),
+                twitter=social_links.get('twitter', ''),
+                source='dexscreener'
+            )
         except Exception as e:
             logger.error(f"Error standardizing DexScreener pair: {e}")
             return None
     
     def _fetch_token_market_data(self, token_address: str, chain_id: str) -> Optional[Dict]:
         """Fetch real market data for a token from DexScreener pairs API"""
+        return self._fetch_market_data_batch([(chain_id, token_address)]).get((chain_id, token_address))
+    
+    def _fetch_market_data_batch(self, token_keys: List[Tuple[str, str]],
+                                 deadline: Optional[Deadline] = None) -> Dict[Tuple[str, str], Dict]:
+        """Fetch real market data for many (chain, address) tokens, serving fresh entries from cache"""
+        market_data = {}
+        stale_keys = []
+        
+        # Preserve order while dropping repeated tokens
+        for key in dict.fromkeys(key for key in token_keys if key[1]):
+            cached = self.market_data_cache.get(key)
+            if cached is MISSING:
+                stale_keys.append(key)
+            elif cached:
+                market_data[key] = cached
+        
+        if stale_keys:
+            batch_size = CONFIG["dexscreener_batch_size"]
+            addresses = [address for _, address in stale_keys]
+            batches = [addresses[i:i + batch_size] for i in range(0, len(addresses), batch_size)]
+            results = self.fetcher.map(lambda batch: self._fetch_market_data_chunk(batch, deadline), batches, default=None)
+            
+            fetched = {}
+            failed_addresses = set()
+            for batch, batch_result in zip(batches, results):
+                if batch_result is None:
+                    failed_addresses.update(batch)
+                else:
+                    fetched.update(batch_result)
+            
+            for key in stale_keys:
+                address = key[1]
+                if address in failed_addresses:
+                    continue  # Don't cache request failures, retry next scan
+                # Cache misses too so tokens without pairs aren't looked up every scan
+                pair = fetched.get(address)
+                self.market_data_cache.set(key, pair)
+                if pair:
+                    market_data[key] = pair
+            
+            logger.info(f"Fetched market data for {len(stale_keys)} tokens in {len(batches)} batched requests")
+        
+        stats = self.market_data_cache.stats()
+        logger.info(f"Market data cache - Size: {stats['size']}, Hits: {stats['hits']}, Misses: {stats['misses']}, Hit rate: {stats['hit_rate']:.0%}")
+        return market_data
+    
+    def _fetch_market_data_chunk(self, token_addresses: List[str],
+                                 deadline: Optional[Deadline] = None) -> Optional[Dict[str, Dict]]:
+        """Fetch one multi-address batch and match the returned pairs back to their tokens.
+        
+        Returns None when the request itself failed so the caller can tell a failure
+        apart from tokens that simply have no pairs yet.
+        """
+        market_data = {}
+        
         try:
             # Use DexScreener tokens API to get real market data
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{token_address}"
+            url = f"https://api.dexscreener.com/latest/dex/tokens/{','.join(token_addresses)}"
             
-            response = self.session.get(url, timeout=10)
+            response = self.fetcher.get(url, deadline=deadline, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
-                pairs = data.get('pairs', [])
+                pairs = data.get('pairs') or []
                 
-                if pairs:
+                # Index pairs by base token address so each lookup is a single hash probe
+                pairs_by_address: Dict[str, List[Dict]] = {}
+                for pair in pairs:
+                    address = pair.get('baseToken', {}).get('address')
+                    if address:
+                        pairs_by_address.setdefault(address, []).append(pair)
+                
+                for token_address in token_addresses:
+                    token_pairs = pairs_by_address.get(token_address)
+                    if not token_pairs:
+                        continue
+                    
                     # Get the pair with highest liquidity for this token
-                    best_pair = max(pairs, key=lambda p: p.get('liquidity', {}).get('usd', 0))
+                    best_pair = max(token_pairs, key=lambda p: p.get('liquidity', {}).get('usd', 0))
                     
                     # Validate the pair has good data
-                    if (best_pair.get('priceUsd') and 
-                        best_pair.get('liquidity', {}).get('usd', 0) > 100 and
-                        best_pair.get('baseToken', {}).get('address') == token_address):
-                        
-                        logger.info(f"Found real market data for {token_address}")
-                        return best_pair
+                    if best_pair.get('priceUsd') and best_pair.get('liquidity', {}).get('usd', 0) > 100:
+                        market_data[token_address] = best_pair
+            else:
+                logger.debug(f"DexScreener tokens API error {response.status_code} for batch of {len(token_addresses)}")
+                return None
                         
         except Exception as e:
-            logger.debug(f"Could not fetch market data for {token_address}: {e}")
+            logger.debug(f"Could not fetch market data for batch of {len(token_addresses)} tokens: {e}")
+            return None
             
-        return None
+        return market_data
     
     def _extract_social_links(self, pair: Dict) -> Dict[str, str]:
         """Extract social media links from DexScreener pair"""
@@ -525,111 +931,92 @@ class TokenScanner:
             logger.debug(f"Error checking pump.fun candidate: {e}")
             return False
     
-    def _scan_fallback_endpoints(self) -> List[Dict]:
+    def _scan_fallback_endpoints(self) -> List[Token]:
         """Scan fallback endpoints when primary sources fail"""
         logger.info("Scanning fallback endpoints...")
         tokens = []
         
-        for endpoint in FALLBACK_ENDPOINTS:
-            try:
-                response = self.session.get(endpoint, timeout=CONFIG["request_timeout"])
-                if response.status_code == 200:
-                    # Basic processing for fallback endpoints
-                    data = response.json()
-                    # Process based on endpoint type
-                    endpoint_tokens = self._process_fallback_response(endpoint, data)
-                    tokens.extend(endpoint_tokens)
-                    
-                time.sleep(CONFIG["rate_limit_delay"])
-                
-            except Exception as e:
-                logger.error(f"Error scanning fallback endpoint {endpoint}: {e}")
-                continue
+        endpoints = self.endpoint_health.prioritize(FALLBACK_ENDPOINTS)
+        results = self.fetcher.map(self._fetch_fallback_endpoint, endpoints, default=[])
+        for endpoint_tokens in results:
+            tokens.extend(endpoint_tokens)
         
         logger.info(f"Found {len(tokens)} tokens from fallback endpoints")
         return tokens
     
-    def _process_fallback_response(self, endpoint: str, data: Any) -> List[Dict]:
+    def _fetch_fallback_endpoint(self, endpoint: str) -> List[Token]:
+        """Fetch tokens from a single fallback endpoint"""
+        try:
+            started = time.monotonic()
+            response = self.fetcher.get(endpoint, timeout=CONFIG["request_timeout"])
+            if response.status_code == 200:
+                # Basic processing for fallback endpoints
+                data = response.json()
+                self.endpoint_health.record_success(endpoint, time.monotonic() - started)
+                # Process based on endpoint type
+                return self._process_fallback_response(endpoint, data)
+        except Exception as e:
+            logger.error(f"Error scanning fallback endpoint {endpoint}: {e}")
+        
+        self._record_failure(endpoint)
+        return []
+    
+    def _process_fallback_response(self, endpoint: str, data: Any) -> List[Token]:
         """Process responses from fallback endpoints"""
         # This is a simplified processor for fallback data
         # In a real implementation, you'd add specific handlers for each endpoint
         return []
     
-    def _deduplicate_tokens(self, tokens: List[Dict]) -> List[Dict]:
+    def _deduplicate_tokens(self, tokens: List[Token], seen_addresses: Optional[Set[str]] = None) -> List[Token]:
         """Remove duplicate tokens based on address"""
-        seen_addresses = set()
+        seen_addresses = set() if seen_addresses is None else seen_addresses
         unique_tokens = []
         
         for token in tokens:
-            address = token.get('address')
+            address = token.address
             if address and address not in seen_addresses:
                 seen_addresses.add(address)
                 unique_tokens.append(token)
         
         return unique_tokens
     
-    def _filter_tokens(self, tokens: List[Dict]) -> List[Dict]:
+    def _filter_tokens(self, tokens: List[Token]) -> List[Token]:
         """Filter tokens based on configured criteria"""
         filtered_tokens = []
         
-        for token in tokens:
-            if self._passes_criteria(token):
-                # Check if token has Telegram social link
-                if not token.get('telegram'):
-                    continue
-                
-                # Check if we've seen this token recently
-                token_id = f"{token.get('chain', '')}:{token.get('address', '')}"
-                if token_id not in self.seen_tokens:
-                    # Add only tokens with Telegram socials
-                    self.seen_tokens.add(token_id)
-                    filtered_tokens.append(token)
+        # Evaluate the criteria for the whole batch in one pass
+        mask = criteria_mask(tokens, self.criteria_config)
+        
+        for token, passes in zip(tokens, mask):
+            # Check if token has Telegram social link
+            if not token.telegram:
+                continue
+            
+            # Check if we've seen this token recently
+            token_id = token.token_id
+            if token_id in self.seen_tokens:
+                # Already seen: pass its latest figures on, even if it now misses the criteria
+                if self.update_listener is not None:
+                    self._notify_update(token)
+                continue
+            
+            if passes:
+                # Add only tokens with Telegram socials; they count as seen once notify takes them
+                filtered_tokens.append(token)
         
         return filtered_tokens
     
-    def _passes_criteria(self, token: Dict) -> bool:
-        """Check if token meets all filtering criteria"""
+    def mark_seen(self, token: Token):
+        """Stop yielding a token as new once it has been handed to the notifier"""
+        self.seen_tokens.add(token.token_id)
+    
+    def forget_seen(self, token: Token):
+        """Offer a token as new again, e.g. after its alert could not be delivered"""
+        self.seen_tokens.discard(token.token_id)
+    
+    def _notify_update(self, token: Token):
         try:
-            # Basic validation first
-            if not token.get('address') or not token.get('name') or not token.get('symbol'):
-                return False
-            
-            # Market cap check - be more lenient for Pump.fun candidates
-            market_cap = token.get('market_cap', 0)
-            is_pump_candidate = token.get('is_pump_candidate', False)
-            
-            if is_pump_candidate:
-                # More permissive for Pump.fun candidates
-                min_cap = max(1000, CONFIG["min_market_cap"] // 10)  # Lower minimum
-                max_cap = CONFIG["max_market_cap"] * 5  # Higher maximum
-            else:
-                min_cap = CONFIG["min_market_cap"]
-                max_cap = CONFIG["max_market_cap"]
-            
-            if market_cap > 0 and not (min_cap <= market_cap <= max_cap):
-                return False
-            
-            # Age check - more lenient for Pump.fun candidates
-            created_timestamp = token.get('created_timestamp', 0)
-            if created_timestamp:
-                created_time = datetime.fromtimestamp(created_timestamp)
-                age_seconds = (datetime.now() - created_time).total_seconds()
-                
-                # Extended age limit for Pump.fun candidates
-                max_age = CONFIG["max_age_seconds"] * 7 if is_pump_candidate else CONFIG["max_age_seconds"]
-                
-                if not (CONFIG["min_age_seconds"] <= age_seconds <= max_age):
-                    return False
-            
-            # Liquidity check - reduced minimum for Pump.fun candidates
-            liquidity = token.get('liquidity_usd', 0)
-            min_liquidity = CONFIG["min_liquidity"] // 5 if is_pump_candidate else CONFIG["min_liquidity"]
-            
-            if liquidity > 0 and liquidity < min_liquidity:
-                return False
-            
-            return True
-            
+            self.update_listener(token)
         except Exception as e:
-            logger.error(f"Error filtering token: {e}")
-            return False
+            logger.error(f"Error in update listener for {token.token_id}: {e}")
+
@@ -8,6 +8,8 @@ import sys
 from datetime import datetime
 from typing import Dict, Any
 
+from models import Token
+
 def setup_logging() -> logging.Logger:
     """Setup logging configuration"""
     
@@ -40,7 +42,7 @@ def validate_config(config: Dict[str, Any]) -> bool:
         # Check required numeric values
         required_nums = [
             'min_market_cap', 'max_market_cap', 'min_age_seconds', 
-            'max_age_seconds', 'min_liquidity', 'scan_interval_minutes'
+            'max_age_seconds', 'min_liquidity', 'scan_interval_seconds'
         ]
         
         for key in required_nums:
@@ -59,8 +61,8 @@ def validate_config(config: Dict[str, Any]) -> bool:
             return False
         
         # Validate scan interval
-        if config['scan_interval_minutes'] < 1:
-            logging.error("scan_interval_minutes must be at least 1")
+        if config['scan_interval_seconds'] < 1:
+            logging.error("scan_interval_seconds must be at least 1")
             return False
         
         logging.info("Configuration validation passed")
@@ -107,12 +109,12 @@ def format_market_cap(market_cap: float) -> str:
     else:
         return f"${market_cap:.2f}"
 
-def get_risk_level(token: Dict[str, Any]) -> str:
+def get_risk_level(token: Token) -> str:
     """Determine risk level based on token metrics"""
     try:
-        market_cap = token.get('market_cap', 0)
-        liquidity = token.get('liquidity_usd', 0)
-        age_seconds = token.get('created_timestamp', 0)
+        market_cap = token.market_cap
+        liquidity = token.liquidity_usd
+        age_seconds = token.created_timestamp
         
         risk_score = 0
         
@@ -141,13 +143,7 @@ def get_risk_level(token: Dict[str, Any]) -> str:
                 risk_score += 1
         
         # Social presence (lack of social links increases risk)
-        has_socials = any([
-            token.get('website'),
-            token.get('telegram'), 
-            token.get('twitter')
-        ])
-        
-        if not has_socials:
+        if not token.has_socials:
             risk_score += 1
         
         # Determine risk level
@@ -223,12 +219,12 @@ def calculate_percentage_change(old_value: float, new_value: float) -> float:
         return 0.0
     return ((new_value - old_value) / old_value) * 100
 
-def is_honeypot_risk(token: Dict[str, Any]) -> bool:
+def is_honeypot_risk(token: Token) -> bool:
     """Basic honeypot risk assessment"""
     try:
         # Very low liquidity compared to market cap
-        market_cap = token.get('market_cap', 0)
-        liquidity = token.get('liquidity_usd', 0)
+        market_cap = token.market_cap
+        liquidity = token.liquidity_usd
         
         if market_cap > 0 and liquidity > 0:
             liquidity_ratio = liquidity / market_cap
@@ -236,15 +232,9 @@ def is_honeypot_risk(token: Dict[str, Any]) -> bool:
                 return True
         
         # No social presence at all
-        has_any_social = any([
-            token.get('website'),
-            token.get('telegram'),
-            token.get('twitter')
-        ])
-        
         # Very new with high market cap but no socials
-        if not has_any_social and market_cap > 100000:
-            created_timestamp = token.get('created_timestamp', 0)
+        if not token.has_socials and market_cap > 100000:
+            created_timestamp = token.created_timestamp
             if created_timestamp:
                 age_hours = (datetime.now().timestamp() - created_timestamp) / 3600
                 if age_hours < 1:  # Less than 1 hour old